@@ -0,0 +1,40 @@
+"""Indexes for the family-month and category-total access paths.
+
+Revision ID: 002_transaction_range_indexes
+Revises: 001_initial
+Create Date: 2026-10-17
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "002_transaction_range_indexes"
+down_revision: Union[str, None] = "001_initial"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # get_by_family_month: family_id = ? AND created_at in [start, end)
+    op.create_index(
+        "ix_transaction_family_created",
+        "transactions",
+        ["family_id", "created_at"],
+        postgresql_where=sa.text("family_id IS NOT NULL"),
+    )
+    # get_category_total: index-only scan, amount_base is carried in the leaf
+    op.create_index(
+        "ix_transaction_user_category_created",
+        "transactions",
+        ["user_id", "category_id", "created_at"],
+        postgresql_include=["amount_base"],
+        postgresql_where=sa.text("type = 'expense'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transaction_user_category_created", table_name="transactions")
+    op.drop_index("ix_transaction_family_created", table_name="transactions")
@@ -0,0 +1,67 @@
+"""Monthly rollups — per-user monthly sums maintained by TransactionService.
+
+Revision ID: 003_monthly_rollups
+Revises: 002_transaction_range_indexes
+Create Date: 2026-10-17
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "003_monthly_rollups"
+down_revision: Union[str, None] = "002_transaction_range_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "monthly_rollups",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column(
+            "user_id",
+            sa.BigInteger,
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("year", sa.SmallInteger, nullable=False),
+        sa.Column("month", sa.SmallInteger, nullable=False),
+        sa.Column("type", sa.String(10), nullable=False),
+        sa.Column("category_id", sa.Integer, nullable=True),
+        sa.Column("total", sa.Numeric(18, 2), nullable=False, server_default="0"),
+        sa.Column("count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint(
+            "user_id",
+            "year",
+            "month",
+            "type",
+            "category_id",
+            name="uq_monthly_rollup_key",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    # Initial backfill from existing transactions (months in each user's timezone)
+    op.execute(
+        """
+        INSERT INTO monthly_rollups (user_id, year, month, type, category_id, total, count)
+        SELECT t.user_id,
+               extract(year FROM timezone(u.timezone, t.created_at))::int,
+               extract(month FROM timezone(u.timezone, t.created_at))::int,
+               t.type,
+               t.category_id,
+               sum(coalesce(t.amount_base, t.amount)),
+               count(*)
+        FROM transactions t
+        JOIN users u ON u.id = t.user_id
+        GROUP BY 1, 2, 3, 4, 5
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("monthly_rollups")
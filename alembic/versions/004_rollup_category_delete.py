@@ -0,0 +1,76 @@
+"""Merge a deleted category's rollups into the "no category" bucket.
+
+Deleting a category sets transactions.category_id to NULL (ON DELETE SET
+NULL); this trigger moves the matching monthly_rollups rows to
+category_id IS NULL in the same transaction, so rollups keep agreeing with
+the transactions.
+
+Revision ID: 004_rollup_category_delete
+Revises: 003_monthly_rollups
+Create Date: 2026-10-17
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "004_rollup_category_delete"
+down_revision: Union[str, None] = "003_monthly_rollups"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows of users being deleted in the same statement are skipped: their
+    # rollups go with them (ON DELETE CASCADE) and must not be re-inserted
+    op.execute(
+        """
+        CREATE FUNCTION merge_deleted_category_rollups() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO monthly_rollups AS r
+                (user_id, year, month, type, category_id, total, count)
+            SELECT d.user_id, d.year, d.month, d.type, NULL, d.total, d.count
+            FROM monthly_rollups d
+            WHERE d.category_id = OLD.id
+              AND EXISTS (SELECT 1 FROM users u WHERE u.id = d.user_id)
+            ON CONFLICT ON CONSTRAINT uq_monthly_rollup_key DO UPDATE
+            SET total = r.total + EXCLUDED.total,
+                count = r.count + EXCLUDED.count;
+            DELETE FROM monthly_rollups WHERE category_id = OLD.id;
+            RETURN OLD;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER categories_merge_rollups
+        AFTER DELETE ON categories
+        FOR EACH ROW EXECUTE FUNCTION merge_deleted_category_rollups()
+        """
+    )
+
+    # Categories deleted before the trigger existed
+    op.execute(
+        """
+        WITH orphaned AS (
+            DELETE FROM monthly_rollups r
+            WHERE r.category_id IS NOT NULL
+              AND NOT EXISTS (SELECT 1 FROM categories c WHERE c.id = r.category_id)
+            RETURNING r.user_id, r.year, r.month, r.type, r.total, r.count
+        )
+        INSERT INTO monthly_rollups AS r (user_id, year, month, type, category_id, total, count)
+        SELECT user_id, year, month, type, NULL, sum(total), sum(count)
+        FROM orphaned
+        GROUP BY 1, 2, 3, 4
+        ON CONFLICT ON CONSTRAINT uq_monthly_rollup_key DO UPDATE
+        SET total = r.total + EXCLUDED.total,
+            count = r.count + EXCLUDED.count
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER categories_merge_rollups ON categories")
+    op.execute("DROP FUNCTION merge_deleted_category_rollups()")
@@ -1,6 +1,23 @@
-"""Redis cache package — client, session store, rate limiter."""
+"""Redis cache package.
 
+Client, session store, user/report caches, category catalogue, OCR cache, rate limiter.
+"""
+
+from app.cache.category_catalogue import CategoryCatalogue, CategorySnapshot
+from app.cache.ocr_cache import OCRCache
 from app.cache.redis_client import get_redis, close_redis
+from app.cache.report_cache import ReportCache
 from app.cache.session_store import SessionStore
+from app.cache.user_cache import UserCache, UserSnapshot
 
-__all__ = ["get_redis", "close_redis", "SessionStore"]
+__all__ = [
+    "CategoryCatalogue",
+    "CategorySnapshot",
+    "get_redis",
+    "close_redis",
+    "OCRCache",
+    "ReportCache",
+    "SessionStore",
+    "UserCache",
+    "UserSnapshot",
+]
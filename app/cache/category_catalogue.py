@@ -0,0 +1,135 @@
+"""Category catalogue — default categories in process memory, custom ones in Redis.
+
+Default categories only change when `scripts/seed_categories.py` runs, so each
+worker loads them once at startup into an immutable tuple. A reseed publishes on
+``categories:refresh`` and every worker listening reloads its copy.
+
+Custom categories are per user and cached in Redis (``cats:{user_id}``); the
+entry is dropped by CategoryService when the user creates a new one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import Awaitable, Callable, Iterable
+from contextlib import suppress
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING
+
+import redis.asyncio as redis
+import structlog
+
+if TYPE_CHECKING:
+    from app.models.category import Category
+
+log = structlog.get_logger()
+
+
+@dataclass(frozen=True, slots=True)
+class CategorySnapshot:
+    """Immutable, session-independent view of a Category row."""
+
+    id: int
+    key: str
+    label: str
+    icon: str
+    is_default: bool
+
+    @classmethod
+    def from_model(cls, category: Category) -> CategorySnapshot:
+        return cls(
+            id=category.id,
+            key=category.key,
+            label=category.label,
+            icon=category.icon,
+            is_default=bool(category.is_default),
+        )
+
+
+class CategoryCatalogue:
+    """Process-wide default categories + Redis-cached custom categories."""
+
+    CUSTOM_TTL = 86400  # 24 hours — custom categories per user
+
+    PREFIX_CUSTOM = "cats:"  # cats:{user_id}
+    CHANNEL = "categories:refresh"
+
+    def __init__(self, redis_client: redis.Redis) -> None:
+        self._r = redis_client
+        self._defaults: tuple[CategorySnapshot, ...] = ()
+        self._by_id: dict[int, CategorySnapshot] = {}
+
+    # ── Defaults (in process) ─────────────────────────────────
+
+    @property
+    def defaults(self) -> tuple[CategorySnapshot, ...]:
+        return self._defaults
+
+    def get_default(self, category_id: int) -> CategorySnapshot | None:
+        return self._by_id.get(category_id)
+
+    def replace_defaults(self, categories: Iterable[Category]) -> None:
+        """Install a freshly loaded set of default categories."""
+        defaults = tuple(CategorySnapshot.from_model(c) for c in categories)
+        # Swap both references at once — readers never see a half-built catalogue
+        self._defaults, self._by_id = defaults, {c.id: c for c in defaults}
+        log.info("category_catalogue_loaded", defaults=len(defaults))
+
+    async def publish_refresh(self) -> None:
+        """Ask every worker to reload its defaults (call after a reseed)."""
+        await self._r.publish(self.CHANNEL, "refresh")
+
+    async def listen(
+        self, reload: Callable[[], Awaitable[None]], max_backoff: float = 30.0
+    ) -> None:
+        """Call `reload` whenever a refresh is published. Runs until cancelled.
+
+        A lost Redis connection is resubscribed with exponential backoff, followed
+        by one reload to catch refreshes published meanwhile. A failing reload is
+        logged and the current catalogue stays in place.
+        """
+        backoff = 1.0
+        reconnecting = False
+        while True:
+            pubsub = self._r.pubsub()
+            try:
+                await pubsub.subscribe(self.CHANNEL)
+                if reconnecting:
+                    await self._reload(reload)
+                    log.info("category_catalogue_listener_resumed")
+                backoff = 1.0
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        await self._reload(reload)
+            except Exception as e:
+                log.warning("category_catalogue_listener_lost", error=repr(e), retry_in=backoff)
+            finally:
+                with suppress(Exception):
+                    await pubsub.aclose()
+            reconnecting = True
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, max_backoff)
+
+    @staticmethod
+    async def _reload(reload: Callable[[], Awaitable[None]]) -> None:
+        try:
+            await reload()
+        except Exception:
+            log.exception("category_catalogue_reload_failed")
+
+    # ── Custom categories (Redis) ─────────────────────────────
+
+    async def get_custom(self, user_id: int) -> tuple[CategorySnapshot, ...] | None:
+        raw = await self._r.get(f"{self.PREFIX_CUSTOM}{user_id}")
+        if raw is None:
+            return None
+        return tuple(CategorySnapshot(**item) for item in json.loads(raw))
+
+    async def set_custom(self, user_id: int, categories: tuple[CategorySnapshot, ...]) -> None:
+        key = f"{self.PREFIX_CUSTOM}{user_id}"
+        payload = json.dumps([asdict(c) for c in categories])
+        await self._r.set(key, payload, ex=self.CUSTOM_TTL)
+
+    async def invalidate_custom(self, user_id: int) -> None:
+        await self._r.delete(f"{self.PREFIX_CUSTOM}{user_id}")
@@ -0,0 +1,71 @@
+"""Redis cache of OCR results for screenshots that were already recognized.
+
+Keys:
+- ocr:file:{file_unique_id} → {"amount", "description"}; Telegram keeps
+  file_unique_id when a photo is forwarded, so repeats skip the download too.
+- ocr:recent:{user_id}      → list of the user's last RECENT_SIZE results with
+  the difference hash of their image, to flag re-uploads of a screenshot
+  (new file id) as possible duplicates once OCR has read the amount.
+"""
+
+from __future__ import annotations
+
+import json
+from decimal import Decimal
+
+import redis.asyncio as redis
+
+from app.utils.ocr import DUPLICATE_MAX_DISTANCE, ImageHash, OCRResult
+
+
+class OCRCache:
+    """OCR results by Telegram file, and recent results for duplicate hints."""
+
+    TTL = 30 * 86400  # 30 days — long enough to catch a forwarded receipt
+    RECENT_SIZE = 20  # results kept per user for the duplicate check
+
+    PREFIX_FILE = "ocr:file:"  # ocr:file:{file_unique_id}
+    PREFIX_RECENT = "ocr:recent:"  # ocr:recent:{user_id}
+
+    def __init__(self, redis_client: redis.Redis) -> None:
+        self._r = redis_client
+
+    async def get_by_file(self, file_unique_id: str) -> OCRResult | None:
+        raw = await self._r.get(f"{self.PREFIX_FILE}{file_unique_id}")
+        return _load(json.loads(raw)) if raw else None
+
+    async def is_duplicate(self, user_id: int, image_hash: ImageHash, result: OCRResult) -> bool:
+        """Whether this user recently sent the same amount on a near-identical image.
+
+        Only a hint: the hash alone cannot tell two receipts of one app apart.
+        """
+        for raw in await self._r.lrange(f"{self.PREFIX_RECENT}{user_id}", 0, -1):
+            entry = json.loads(raw)
+            if (
+                Decimal(entry["amount"]) == result.amount
+                and image_hash.distance(ImageHash.from_str(entry["hash"]))
+                <= DUPLICATE_MAX_DISTANCE
+            ):
+                return True
+        return False
+
+    async def set(
+        self, file_unique_id: str, user_id: int, image_hash: ImageHash, result: OCRResult
+    ) -> None:
+        payload = {"amount": str(result.amount), "description": result.description}
+        recent_key = f"{self.PREFIX_RECENT}{user_id}"
+        async with self._r.pipeline(transaction=False) as pipe:
+            pipe.set(f"{self.PREFIX_FILE}{file_unique_id}", json.dumps(payload), ex=self.TTL)
+            pipe.lpush(recent_key, json.dumps({**payload, "hash": image_hash.to_str()}))
+            pipe.ltrim(recent_key, 0, self.RECENT_SIZE - 1)
+            pipe.expire(recent_key, self.TTL)
+            await pipe.execute()
+
+
+def _load(entry: dict) -> OCRResult:
+    return OCRResult(
+        amount=Decimal(entry["amount"]),
+        description=entry["description"],
+        raw_text="",
+        duplicate=True,
+    )
@@ -1,49 +1,174 @@
-"""Redis-based rate limiter for Telegram handlers."""
+"""Redis-based rate limiter for Telegram handlers.
+
+GCRA (generic cell rate algorithm): one key per user and kind holds the
+"theoretical arrival time" (TAT) of the next request in milliseconds. A request
+is allowed if it would not push TAT more than `burst` intervals into the
+future. This is a token bucket that refills continuously, so unlike a fixed
+window it cannot admit 2× the limit around a window boundary.
+
+The whole check-and-update runs as one Lua script (EVALSHA), so it is atomic,
+costs one round trip, and every key it writes carries a TTL.
+
+LocalRateLimiter sits in front of it: a bounded in-process LRU of the same
+buckets. It never allows anything on its own. It only rejects requests that are
+certain to fail. Those are requests over the limit in this process alone, and
+requests from a user Redis has already throttled. A flood therefore stops
+costing Redis calls after its first rejection.
+"""
 
 from __future__ import annotations
 
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
 import redis.asyncio as redis
 
+# KEYS[1] = rl:{kind}:{user_id}
+# ARGV[1] = emission interval, ms per request
+# ARGV[2] = burst, requests that may arrive back to back
+# → {allowed (0|1), retry_after_ms}
+GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+
+local new_tat = tat + interval
+local allow_at = new_tat - burst * interval
+if allow_at > now then
+    return {0, allow_at - now}
+end
+
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now)
+return {1, 0}
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class Limit:
+    """`rate` requests per `period` seconds, of which `burst` may come at once."""
+
+    rate: int
+    period: int = 60
+    burst: int = 1
+
+    @property
+    def interval_ms(self) -> int:
+        return max(1, self.period * 1000 // self.rate)
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitResult:
+    allowed: bool
+    retry_after: float  # seconds until the next request would be allowed
+
+
+DEFAULT_LIMITS = {
+    "message": Limit(rate=30, burst=10),
+    "callback": Limit(rate=60, burst=20),
+    "photo": Limit(rate=6, burst=3),  # each photo costs an OCR run
+}
+
 
 class RateLimiter:
-    """Sliding window rate limiter using Redis.
+    """Per-user GCRA rate limiter with separate limits per update kind.
 
     Usage::
 
         limiter = RateLimiter(redis_client)
-        allowed = await limiter.is_allowed(user_id=123, limit=30, window=60)
+        result = await limiter.hit(user_id=123, kind="photo")
+        if not result.allowed:
+            ...  # retry in result.retry_after seconds
     """
 
-    PREFIX = "rl:"
+    PREFIX = "rl:"  # rl:{kind}:{user_id}
 
-    def __init__(self, redis_client: redis.Redis) -> None:
+    def __init__(
+        self, redis_client: redis.Redis, limits: dict[str, Limit] | None = None
+    ) -> None:
         self._r = redis_client
+        self._limits = limits or DEFAULT_LIMITS
+        # redis-py sends EVALSHA and falls back to EVAL (loading the script) on NOSCRIPT
+        self._script = redis_client.register_script(GCRA_SCRIPT)
 
-    async def is_allowed(
-        self,
-        user_id: int,
-        limit: int = 30,
-        window: int = 60,
-    ) -> bool:
-        """Check if user is within rate limit.
+    def limit_for(self, kind: str) -> Limit:
+        return self._limits[kind]
+
+    async def hit(self, user_id: int, kind: str = "message") -> RateLimitResult:
+        """Count one request of `kind` and report whether it is allowed.
 
         Args:
             user_id: Telegram user ID.
-            limit: Max requests per window.
-            window: Window size in seconds.
+            kind: Key into the configured limits — "message", "callback", "photo".
 
         Returns:
-            True if allowed, False if rate-limited.
+            RateLimitResult with `allowed` and, if rejected, `retry_after`.
         """
-        key = f"{self.PREFIX}{user_id}"
-        current = await self._r.incr(key)
-        if current == 1:
-            await self._r.expire(key, window)
-        return current <= limit
-
-    async def get_remaining(self, user_id: int, limit: int = 30) -> int:
-        """Get remaining requests for user."""
-        key = f"{self.PREFIX}{user_id}"
-        current = await self._r.get(key)
-        used = int(current) if current else 0
-        return max(0, limit - used)
+        limit = self._limits[kind]
+        allowed, retry_after_ms = await self._script(
+            keys=[f"{self.PREFIX}{kind}:{user_id}"],
+            args=[limit.interval_ms, limit.burst],
+        )
+        return RateLimitResult(bool(allowed), int(retry_after_ms) / 1000)
+
+
+class LocalRateLimiter:
+    """Per-process pre-filter for RateLimiter, bounded to `max_users` entries.
+
+    This process sees a subset of a user's requests, so its buckets can only
+    run out later than the shared one. That makes a local rejection always
+    correct and lets it skip the Redis call.
+    """
+
+    def __init__(self, limits: dict[str, Limit] | None = None, max_users: int = 10_000) -> None:
+        self._limits = limits or DEFAULT_LIMITS
+        self._max_users = max_users
+        # (kind, user_id) → [tat, blocked_until, notified_until], monotonic seconds
+        self._entries: OrderedDict[tuple[str, int], list[float]] = OrderedDict()
+
+    def _entry(self, kind: str, user_id: int) -> list[float]:
+        key = (kind, user_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = [0.0, 0.0, 0.0]
+            if len(self._entries) > self._max_users:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+        return entry
+
+    def check(self, user_id: int, kind: str = "message") -> RateLimitResult:
+        """Count one request locally; `allowed` means "ask Redis"."""
+        limit = self._limits[kind]
+        interval = limit.interval_ms / 1000
+        now = time.monotonic()
+        entry = self._entry(kind, user_id)
+
+        if entry[1] > now:
+            return RateLimitResult(False, entry[1] - now)
+
+        tat = max(entry[0], now)
+        allow_at = tat + interval - limit.burst * interval
+        if allow_at > now:
+            return RateLimitResult(False, allow_at - now)
+        entry[0] = tat + interval
+        return RateLimitResult(True, 0)
+
+    def block(self, user_id: int, kind: str, retry_after: float) -> None:
+        """Remember a Redis rejection so the user's next requests stay local."""
+        self._entry(kind, user_id)[1] = time.monotonic() + retry_after
+
+    def should_notify(self, user_id: int, retry_after: float, min_gap: float = 5.0) -> bool:
+        """At most one "too many requests" reply per user per throttling period."""
+        now = time.monotonic()
+        entry = self._entry("notify", user_id)
+        if entry[2] > now:
+            return False
+        entry[2] = now + max(retry_after, min_gap)
+        return True
@@ -0,0 +1,61 @@
+"""Redis cache for rendered reports, invalidated by a per-user version counter.
+
+Keys:
+- report_ver:{user_id}  → integer, bumped on every change that affects reports
+- report:{user_id}      → hash: "{year}-{month}:{currency}:{lang}" → {"v": version, "html": ...}
+
+A cached entry is served only if its version equals the current counter, so a
+report rendered concurrently with a change can never be served once the change
+has been committed. Reads and invalidations are one pipelined round trip each.
+"""
+
+from __future__ import annotations
+
+import json
+
+import redis.asyncio as redis
+
+
+class ReportCache:
+    """Rendered-report cache keyed by user, period, currency and language."""
+
+    TTL = 3600  # 1 hour — rendered reports
+
+    PREFIX_REPORT = "report:"  # report:{user_id}
+    PREFIX_VERSION = "report_ver:"  # report_ver:{user_id}
+
+    def __init__(self, redis_client: redis.Redis) -> None:
+        self._r = redis_client
+
+    @staticmethod
+    def field(year: int, month: int, currency: str, lang: str) -> str:
+        return f"{year}-{month:02d}:{currency}:{lang}"
+
+    async def get(self, user_id: int, field: str) -> tuple[str | None, int]:
+        """Return (cached HTML or None, current version)."""
+        async with self._r.pipeline(transaction=False) as pipe:
+            pipe.get(f"{self.PREFIX_VERSION}{user_id}")
+            pipe.hget(f"{self.PREFIX_REPORT}{user_id}", field)
+            raw_version, raw = await pipe.execute()
+
+        version = int(raw_version) if raw_version else 0
+        if raw:
+            entry = json.loads(raw)
+            if entry["v"] == version:
+                return entry["html"], version
+        return None, version
+
+    async def set(self, user_id: int, field: str, html: str, version: int) -> None:
+        """Store a report rendered from data as of `version` (from `get`)."""
+        key = f"{self.PREFIX_REPORT}{user_id}"
+        async with self._r.pipeline(transaction=False) as pipe:
+            pipe.hset(key, field, json.dumps({"v": version, "html": html}))
+            pipe.expire(key, self.TTL)
+            await pipe.execute()
+
+    async def invalidate(self, user_id: int) -> None:
+        """Bump the user's version and drop stale renders."""
+        async with self._r.pipeline(transaction=False) as pipe:
+            pipe.incr(f"{self.PREFIX_VERSION}{user_id}")
+            pipe.delete(f"{self.PREFIX_REPORT}{user_id}")
+            await pipe.execute()
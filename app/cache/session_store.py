@@ -6,14 +6,38 @@ Stores:
 - current_mode (key: user_id → "expense" | "income")
 
 All data is JSON-serialized and has TTL to auto-expire stale entries.
+Reads a handler needs together are pipelined into one round trip.
+
+With a circuit breaker every call has a `timeout` deadline, and a slow or
+unreachable Redis raises ServiceBusyError (UnitOfWorkMiddleware turns it into
+a "busy" reply) instead of hanging the handler.
 """
 
 from __future__ import annotations
 
 import json
+from contextlib import AbstractAsyncContextManager, nullcontext
+from dataclasses import dataclass
 from typing import Any
 
 import redis.asyncio as redis
+from redis import exceptions as redis_exc
+
+from app.utils.circuit_breaker import CircuitBreaker
+
+# Errors that mean "Redis is unavailable" (a deadline overrun counts as well)
+REDIS_FAILURES: tuple[type[BaseException], ...] = (
+    redis_exc.ConnectionError,
+    redis_exc.TimeoutError,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class InputState:
+    """What a free-form message means for a user right now."""
+
+    waiting_category: dict[str, Any] | None  # set → the text is a new category name
+    mode: str  # "expense" | "income"
 
 
 class SessionStore:
@@ -29,52 +53,91 @@ class SessionStore:
     PREFIX_WAITING = "waiting:"  # waiting:{user_id}
     PREFIX_MODE = "mode:"  # mode:{user_id}
 
-    def __init__(self, redis_client: redis.Redis) -> None:
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        breaker: CircuitBreaker | None = None,
+        timeout: float = 1.0,
+    ) -> None:
         self._r = redis_client
+        self._breaker = breaker
+        self._timeout = timeout
+
+    def _guard(self) -> AbstractAsyncContextManager[Any]:
+        if self._breaker is None:
+            return nullcontext()
+        return self._breaker.guard(self._timeout)
 
     # ── Pending expenses (waiting for category pick) ──────────
 
     async def set_pending(self, msg_id: int, data: dict[str, Any]) -> None:
-        key = f"{self.PREFIX_PENDING}{msg_id}"
-        await self._r.set(key, json.dumps(data), ex=self.PENDING_TTL)
+        async with self._guard():
+            key = f"{self.PREFIX_PENDING}{msg_id}"
+            await self._r.set(key, json.dumps(data), ex=self.PENDING_TTL)
 
     async def get_pending(self, msg_id: int) -> dict[str, Any] | None:
-        key = f"{self.PREFIX_PENDING}{msg_id}"
-        raw = await self._r.get(key)
-        return json.loads(raw) if raw else None
+        async with self._guard():
+            key = f"{self.PREFIX_PENDING}{msg_id}"
+            raw = await self._r.get(key)
+            return json.loads(raw) if raw else None
 
     async def pop_pending(self, msg_id: int) -> dict[str, Any] | None:
-        key = f"{self.PREFIX_PENDING}{msg_id}"
-        raw = await self._r.getdel(key)
-        return json.loads(raw) if raw else None
+        async with self._guard():
+            key = f"{self.PREFIX_PENDING}{msg_id}"
+            raw = await self._r.getdel(key)
+            return json.loads(raw) if raw else None
 
     # ── Waiting for new category name ─────────────────────────
 
     async def set_waiting_category(self, user_id: int, data: dict[str, Any]) -> None:
-        key = f"{self.PREFIX_WAITING}{user_id}"
-        await self._r.set(key, json.dumps(data), ex=self.WAITING_TTL)
+        async with self._guard():
+            key = f"{self.PREFIX_WAITING}{user_id}"
+            await self._r.set(key, json.dumps(data), ex=self.WAITING_TTL)
 
     async def get_waiting_category(self, user_id: int) -> dict[str, Any] | None:
-        key = f"{self.PREFIX_WAITING}{user_id}"
-        raw = await self._r.get(key)
-        return json.loads(raw) if raw else None
+        async with self._guard():
+            key = f"{self.PREFIX_WAITING}{user_id}"
+            raw = await self._r.get(key)
+            return json.loads(raw) if raw else None
 
     async def pop_waiting_category(self, user_id: int) -> dict[str, Any] | None:
-        key = f"{self.PREFIX_WAITING}{user_id}"
-        raw = await self._r.getdel(key)
-        return json.loads(raw) if raw else None
+        async with self._guard():
+            key = f"{self.PREFIX_WAITING}{user_id}"
+            raw = await self._r.getdel(key)
+            return json.loads(raw) if raw else None
 
     async def is_waiting_category(self, user_id: int) -> bool:
-        key = f"{self.PREFIX_WAITING}{user_id}"
-        return bool(await self._r.exists(key))
+        async with self._guard():
+            key = f"{self.PREFIX_WAITING}{user_id}"
+            return bool(await self._r.exists(key))
 
     # ── Current mode (expense / income) ───────────────────────
 
     async def set_mode(self, user_id: int, mode: str) -> None:
-        key = f"{self.PREFIX_MODE}{user_id}"
-        await self._r.set(key, mode, ex=self.MODE_TTL)
+        async with self._guard():
+            key = f"{self.PREFIX_MODE}{user_id}"
+            await self._r.set(key, mode, ex=self.MODE_TTL)
 
     async def get_mode(self, user_id: int) -> str:
-        key = f"{self.PREFIX_MODE}{user_id}"
-        raw = await self._r.get(key)
-        return raw if raw else "expense"
+        async with self._guard():
+            key = f"{self.PREFIX_MODE}{user_id}"
+            raw = await self._r.get(key)
+            return raw if raw else "expense"
+
+    # ── Batched reads ─────────────────────────────────────────
+
+    async def take_input_state(self, user_id: int) -> InputState:
+        """Pop the waiting-for-category-name state and read the mode in one round trip.
+
+        The waiting state is consumed: callers that reject the name put it back
+        with `set_waiting_category`.
+        """
+        async with self._guard():
+            async with self._r.pipeline(transaction=False) as pipe:
+                pipe.getdel(f"{self.PREFIX_WAITING}{user_id}")
+                pipe.get(f"{self.PREFIX_MODE}{user_id}")
+                raw_waiting, raw_mode = await pipe.execute()
+            return InputState(
+                waiting_category=json.loads(raw_waiting) if raw_waiting else None,
+                mode=raw_mode if raw_mode else "expense",
+            )
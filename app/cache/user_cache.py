@@ -0,0 +1,75 @@
+"""Redis-backed user snapshot cache — keyed by Telegram user id.
+
+Holds the handful of User columns every update needs (id, registration flag,
+language, currency, timezone, names), so resolving the user for an update costs
+one Redis GET instead of a SELECT on `users`.
+
+Written through by UserService on registration and settings changes.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING
+
+import redis.asyncio as redis
+
+if TYPE_CHECKING:
+    from app.models.user import User
+
+
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    """Immutable, session-independent view of a User row."""
+
+    id: int
+    telegram_id: int
+    username: str | None
+    first_name: str | None
+    is_registered: bool
+    language: str
+    default_currency: str
+    timezone: str
+
+    @classmethod
+    def from_model(cls, user: User) -> UserSnapshot:
+        return cls(
+            id=user.id,
+            telegram_id=user.telegram_id,
+            username=user.username,
+            first_name=user.first_name,
+            is_registered=bool(user.is_registered),
+            language=user.language,
+            default_currency=user.default_currency,
+            timezone=user.timezone,
+        )
+
+    def is_stale(self, username: str | None, first_name: str | None) -> bool:
+        """True if Telegram reports a name the DB row doesn't have yet."""
+        return bool(
+            (username and username != self.username)
+            or (first_name and first_name != self.first_name)
+        )
+
+
+class UserCache:
+    """Redis store for UserSnapshot objects."""
+
+    TTL = 86400  # 24 hours — refreshed on every write-through
+
+    PREFIX = "user:"  # user:{telegram_id}
+
+    def __init__(self, redis_client: redis.Redis) -> None:
+        self._r = redis_client
+
+    async def get(self, telegram_id: int) -> UserSnapshot | None:
+        raw = await self._r.get(f"{self.PREFIX}{telegram_id}")
+        return UserSnapshot(**json.loads(raw)) if raw else None
+
+    async def set(self, snapshot: UserSnapshot) -> None:
+        key = f"{self.PREFIX}{snapshot.telegram_id}"
+        await self._r.set(key, json.dumps(asdict(snapshot)), ex=self.TTL)
+
+    async def delete(self, telegram_id: int) -> None:
+        await self._r.delete(f"{self.PREFIX}{telegram_id}")
@@ -42,8 +42,16 @@ class Settings(BaseSettings):
             f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
         )
 
+    db_pool_timeout: float = 3.0  # seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # seconds before a connection is replaced
+
     # ── Redis ─────────────────────────────────────────────────
     redis_url: str = "redis://localhost:6379/0"
+    redis_timeout: float = 1.0  # seconds per session-store call
+
+    # ── Load shedding (circuit breakers) ──────────────────────
+    breaker_threshold: int = 5  # consecutive DB/Redis failures before shedding
+    breaker_reset: float = 10.0  # seconds until a probe request is let through
 
     # ── App ───────────────────────────────────────────────────
     app_env: Literal["development", "production", "testing"] = "development"
@@ -52,6 +60,37 @@ class Settings(BaseSettings):
     default_currency: str = "UZS"
     default_timezone: str = "Asia/Tashkent"
 
+    # ── Rate limits (per user per minute / back-to-back burst) ─
+    rate_limit_messages: int = 30
+    rate_limit_messages_burst: int = 10
+    rate_limit_callbacks: int = 60
+    rate_limit_callbacks_burst: int = 20
+    rate_limit_photos: int = 6
+    rate_limit_photos_burst: int = 3
+
+    # ── OCR ───────────────────────────────────────────────────
+    ocr_workers: int = 2
+    ocr_max_pending: int = 8  # running + queued jobs before "busy"
+    ocr_timeout: float = 15.0  # seconds per screenshot; Tesseract is killed after it
+    ocr_crop_amount_region: bool = False  # OCR the top of the screen first
+
+    # ── Outgoing messages (Telegram flood limits) ─────────────
+    send_rate_global: float = 30.0  # messages per second, whole bot
+    send_rate_per_chat: float = 1.0  # messages per second, one chat
+    send_chat_burst: int = 3  # back-to-back messages per chat before pacing
+
+    # ── Update processing ─────────────────────────────────────
+    update_workers: int = 16  # concurrent handlers; keep below the DB pool size
+    update_slow_workers: int = 8  # of those, at most this many on photos/reports
+    update_queue_size: int = 1000  # accepted, not started updates before 503
+
+    # ── Multi-instance mode (updates distributed via Redis streams) ─
+    # single: receive and handle here; ingress: receive only; worker: handle only
+    run_mode: Literal["single", "ingress", "worker"] = "single"
+    stream_partitions: int = 16  # fixed once deployed: it decides the user → stream map
+    stream_worker_index: int = 0  # this worker reads partitions n % count == index
+    stream_worker_count: int = 1
+
     # ── Sentry ────────────────────────────────────────────────
     sentry_dsn: str = ""
 
@@ -9,9 +9,15 @@ from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
 class Base(DeclarativeBase):
-    """Base class for all ORM models."""
+    """Base class for all ORM models.
+
+    eager_defaults: server-generated columns (id, created_at, server_default
+    values) come back in the INSERT's RETURNING clause, so a flushed object is
+    complete without a follow-up SELECT.
+    """
 
     __abstract__ = True
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     created_at: Mapped[datetime] = mapped_column(
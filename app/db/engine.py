@@ -10,15 +10,22 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from app.config import get_settings
+from app.db.pool_metrics import TimedQueuePool
 
 _settings = get_settings()
 
 engine: AsyncEngine = create_async_engine(
     _settings.database_url,
     echo=(_settings.app_env == "development"),
+    poolclass=TimedQueuePool,
     pool_size=20,
     max_overflow=10,
-    pool_pre_ping=True,
+    # Fail fast when all 30 connections are busy instead of the 30 s default
+    pool_timeout=_settings.db_pool_timeout,
+    # No pre-ping round trip per checkout; recycling retires idle connections
+    # before the server or a proxy drops them, and a broken one is discarded
+    # on its first error
+    pool_recycle=_settings.db_pool_recycle,
 )
 
 async_session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
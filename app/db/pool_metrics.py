@@ -0,0 +1,85 @@
+"""Connection-pool wait times — how long checkouts queue for a connection.
+
+`TimedQueuePool` is the engine's default async pool with the wait for a
+connection timed into a `WaitHistogram`; `report_pool_stats` logs it every
+`interval` seconds as ``db_pool_stats`` together with the pool's occupancy,
+which is what pool_size / max_overflow should be sized from.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import time
+from typing import Any
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+log = structlog.get_logger()
+
+# Upper bounds in ms; the last bucket counts everything slower
+BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class WaitHistogram:
+    """Fixed-bucket histogram of wait times, reset on every read."""
+
+    def __init__(self) -> None:
+        self._reset()
+
+    def _reset(self) -> None:
+        self._counts = [0] * (len(BUCKETS_MS) + 1)
+        self._max_ms = 0.0
+        self._failed = 0
+
+    def observe(self, ms: float) -> None:
+        self._counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self._max_ms = max(self._max_ms, ms)
+
+    def observe_failure(self) -> None:
+        self._failed += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """Counts per bucket (``le_1``, ..., ``gt_2500``) since the last snapshot."""
+        labels = [f"le_{b}" for b in BUCKETS_MS] + [f"gt_{BUCKETS_MS[-1]}"]
+        result: dict[str, Any] = dict(zip(labels, self._counts, strict=True))
+        result["max_ms"] = round(self._max_ms, 1)
+        result["failed"] = self._failed
+        self._reset()
+        return result
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waited.
+
+    The wait includes opening a new connection when the pool grows.
+    """
+
+    wait_histogram = WaitHistogram()
+
+    def _do_get(self) -> Any:
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            # Gave up after pool_timeout, or the new connection failed
+            self.wait_histogram.observe_failure()
+            raise
+        self.wait_histogram.observe((time.perf_counter() - started) * 1000)
+        return conn
+
+
+async def report_pool_stats(engine: AsyncEngine, interval: float = 60.0) -> None:
+    """Log checkout waits and occupancy every `interval` seconds. Runs until cancelled."""
+    pool = engine.pool
+    while True:
+        await asyncio.sleep(interval)
+        log.info(
+            "db_pool_stats",
+            size=pool.size(),  # type: ignore[attr-defined]
+            checked_out=pool.checkedout(),  # type: ignore[attr-defined]
+            overflow=pool.overflow(),  # type: ignore[attr-defined]
+            **TimedQueuePool.wait_histogram.snapshot(),
+        )
@@ -4,9 +4,10 @@ Router order:
 1. errors  — global error handler
 2. start   — /start, /help, mode buttons (exact text matches)
 3. settings — settings callbacks
-4. categories — category selection + new category (callbacks + waiting state)
+4. categories — category selection + new category callbacks
 5. reports  — /report + report type callbacks
-6. add_transaction — text + photo (catch-all, must be LAST)
+6. add_transaction — text + photo (catch-all, must be LAST); also routes
+   the new-category name typed after the ➕ button
 """
 
 from __future__ import annotations
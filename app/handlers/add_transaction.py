@@ -2,16 +2,24 @@
 
 from __future__ import annotations
 
+import asyncio
+import html
+from decimal import Decimal
+
 from aiogram import Bot, F, Router
 from aiogram.types import Message
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache.category_catalogue import CategoryCatalogue
+from app.cache.report_cache import ReportCache
 from app.cache.session_store import SessionStore
+from app.cache.user_cache import UserSnapshot
+from app.handlers.categories import on_new_category_name
 from app.keyboards.categories import build_category_keyboard
-from app.models.user import User
 from app.services.category_service import CategoryService
-from app.services.ocr_service import OCRService
+from app.services.ocr_service import OCRBusyError, OCRService
 from app.utils.formatting import format_amount_short
+from app.utils.ocr import pick_photo_size
 from app.utils.parsing import parse_expense_text
 
 router = Router()
@@ -21,24 +29,35 @@ MODE_LABELS = {
     "income": "🟢",
 }
 
+MAX_PASTED_LINES = 50  # keeps the summary message under Telegram's 4096 chars
+
 
 @router.message(F.photo)
 async def handle_photo(
     message: Message,
     bot: Bot,
-    user: User,
+    user: UserSnapshot,
     session: AsyncSession,
     session_store: SessionStore,
+    category_catalogue: CategoryCatalogue,
+    ocr_service: OCRService,
+    album: list[Message] | None = None,
 ) -> None:
     """Handle screenshot from banking app. Supports caption as override."""
     mode = await session_store.get_mode(user.telegram_id)
     icon = MODE_LABELS[mode]
 
+    if album is not None and len(album) > 1:
+        await _handle_album(
+            album, bot, user, session, session_store, category_catalogue, ocr_service, mode
+        )
+        return
+
     # If photo has caption, try to parse it
     if message.caption:
         result = parse_expense_text(message.caption)
         if result:
-            cat_service = CategoryService(session)
+            cat_service = CategoryService(session, catalogue=category_catalogue)
             categories = await cat_service.get_for_user(user.id)
 
             formatted = format_amount_short(result.amount)
@@ -56,8 +75,16 @@ async def handle_photo(
             return
 
     # Try OCR
-    photo = message.photo[-1]
-    ocr_result = await OCRService.process_photo(bot, photo.file_id)
+    photo = pick_photo_size(message.photo)
+    try:
+        ocr_result = await ocr_service.process_photo(bot, photo, user.id)
+    except OCRBusyError:
+        await message.answer(
+            "⏳ Сейчас много скриншотов в обработке.\n\n"
+            "Отправь скриншот с подписью — сумма и описание:\n"
+            "<code>1000000 газ</code>",
+        )
+        return
 
     if ocr_result is None:
         await message.answer(
@@ -67,12 +94,16 @@ async def handle_photo(
         )
         return
 
-    cat_service = CategoryService(session)
+    cat_service = CategoryService(session, catalogue=category_catalogue)
     categories = await cat_service.get_for_user(user.id)
 
     formatted = format_amount_short(ocr_result.amount)
+    hint = ""
+    if ocr_result.duplicate:
+        hint = "\n\n⚠️ Возможно, дубликат — этот скриншот уже присылали."
     reply = await message.answer(
-        f"{icon} Распознано: <b>{formatted}</b> — {ocr_result.description}\n\nВыбери категорию:",
+        f"{icon} Распознано: <b>{formatted}</b> — {ocr_result.description}{hint}"
+        "\n\nВыбери категорию:",
         reply_markup=build_category_keyboard(categories),
     )
     await session_store.set_pending(reply.message_id, {
@@ -84,19 +115,165 @@ async def handle_photo(
     })
 
 
+async def _handle_album(
+    album: list[Message],
+    bot: Bot,
+    user: UserSnapshot,
+    session: AsyncSession,
+    session_store: SessionStore,
+    category_catalogue: CategoryCatalogue,
+    ocr_service: OCRService,
+    mode: str,
+) -> None:
+    """Recognize a media group in parallel and offer one category picker for all of it.
+
+    At most `ocr_service.parallel_jobs` photos are in the OCR pool at once, so
+    a big album waits for workers instead of running into `max_pending`.
+    """
+    ocr_slots = asyncio.Semaphore(ocr_service.parallel_jobs)
+    busy = 0
+
+    async def recognize(message: Message) -> dict | None:
+        nonlocal busy
+        if message.caption:
+            parsed = parse_expense_text(message.caption)
+            if parsed:
+                return {
+                    "amount": str(parsed.amount),
+                    "description": parsed.description,
+                    "currency": parsed.currency or user.default_currency,
+                    "duplicate": False,
+                }
+        try:
+            async with ocr_slots:
+                result = await ocr_service.process_photo(
+                    bot, pick_photo_size(message.photo), user.id
+                )
+        except OCRBusyError:
+            busy += 1
+            return None
+        if result is None:
+            return None
+        return {
+            "amount": str(result.amount),
+            "description": result.description,
+            "currency": user.default_currency,
+            "duplicate": result.duplicate,
+        }
+
+    results = await asyncio.gather(*(recognize(m) for m in album))
+    items = [item for item in results if item is not None]
+    failed = len(album) - len(items) - busy
+
+    if not items and busy:
+        await album[0].answer(
+            "⏳ Сейчас много скриншотов в обработке.\n\n"
+            "Отправь их чуть позже или по одному с подписью — сумма и описание:\n"
+            "<code>1000000 газ</code>",
+        )
+        return
+    if not items:
+        await album[0].answer(
+            "Не удалось распознать суммы на скриншотах.\n\n"
+            "Отправь их по одному с подписью — сумма и описание:\n"
+            "<code>1000000 газ</code>",
+        )
+        return
+
+    notes = []
+    if failed:
+        notes.append(f"❌ Не распознано: {failed} — отправь их с подписью.")
+    if busy:
+        notes.append(f"⏳ Не обработано, сервер занят: {busy} — отправь их чуть позже.")
+    if any(item["duplicate"] for item in items):
+        notes.append("⚠️ — возможно, дубликат: этот скриншот уже присылали.")
+    await _offer_batch(
+        album[0],
+        f"Распознано {len(items)} из {len(album)}",
+        items,
+        notes,
+        "photo",
+        mode,
+        user,
+        session,
+        session_store,
+        category_catalogue,
+    )
+
+
+async def _offer_batch(
+    message: Message,
+    title: str,
+    items: list[dict],
+    notes: list[str],
+    source: str,
+    mode: str,
+    user: UserSnapshot,
+    session: AsyncSession,
+    session_store: SessionStore,
+    category_catalogue: CategoryCatalogue,
+) -> None:
+    """List several entries and offer one category picker that saves them all."""
+    lines = [f"{MODE_LABELS[mode]} {title}:"]
+    for n, item in enumerate(items, start=1):
+        mark = " ⚠️" if item.get("duplicate") else ""
+        lines.append(
+            f"{n}. <b>{format_amount_short(Decimal(item['amount']))}</b>"
+            f" — {item['description']}{mark}"
+        )
+    if notes:
+        lines.append("")
+        lines.extend(notes)
+    lines.append("\nВыбери категорию для всех:")
+
+    cat_service = CategoryService(session, catalogue=category_catalogue)
+    categories = await cat_service.get_for_user(user.id)
+
+    reply = await message.answer(
+        "\n".join(lines), reply_markup=build_category_keyboard(categories)
+    )
+    await session_store.set_pending(reply.message_id, {
+        "items": [
+            {key: item[key] for key in ("amount", "description", "currency")} for item in items
+        ],
+        "source": source,
+        "entry_type": mode,
+    })
+
+
 @router.message(F.text)
 async def handle_text(
     message: Message,
-    user: User,
+    user: UserSnapshot,
     session: AsyncSession,
     session_store: SessionStore,
+    report_cache: ReportCache,
+    category_catalogue: CategoryCatalogue,
 ) -> None:
-    """Handle text expense like '50000 обед в кафе'."""
+    """Handle text expense like '50000 обед в кафе' — or a new category name."""
     if not message.text or message.text.startswith("/"):
         return
 
-    # Skip if user is typing a new category name
-    if await session_store.is_waiting_category(user.telegram_id):
+    # One round trip: are we waiting for a category name, and which mode is on
+    state = await session_store.take_input_state(user.telegram_id)
+    if state.waiting_category is not None:
+        await on_new_category_name(
+            message,
+            state.waiting_category,
+            user=user,
+            session=session,
+            session_store=session_store,
+            report_cache=report_cache,
+            category_catalogue=category_catalogue,
+        )
+        return
+
+    # Several lines pasted at once — one entry per line, one category pick
+    lines = [line for line in message.text.splitlines() if line.strip()]
+    if len(lines) > 1:
+        await _handle_pasted_lines(
+            message, lines, user, session, session_store, category_catalogue, state.mode
+        )
         return
 
     result = parse_expense_text(message.text)
@@ -106,10 +283,10 @@ async def handle_text(
         )
         return
 
-    mode = await session_store.get_mode(user.telegram_id)
+    mode = state.mode
     icon = MODE_LABELS[mode]
 
-    cat_service = CategoryService(session)
+    cat_service = CategoryService(session, catalogue=category_catalogue)
     categories = await cat_service.get_for_user(user.id)
 
     formatted = format_amount_short(result.amount)
@@ -124,3 +301,53 @@ async def handle_text(
         "source": "text",
         "entry_type": mode,
     })
+
+
+async def _handle_pasted_lines(
+    message: Message,
+    lines: list[str],
+    user: UserSnapshot,
+    session: AsyncSession,
+    session_store: SessionStore,
+    category_catalogue: CategoryCatalogue,
+    mode: str,
+) -> None:
+    """Several expenses pasted as lines of one message."""
+    items = []
+    skipped = []
+    for line in lines[:MAX_PASTED_LINES]:
+        parsed = parse_expense_text(line)
+        if parsed is None:
+            skipped.append(line.strip())
+            continue
+        items.append({
+            "amount": str(parsed.amount),
+            "description": parsed.description,
+            "currency": parsed.currency or user.default_currency,
+        })
+
+    if not items:
+        await message.answer(
+            "Не понял. Напиши сумму и описание — по одной записи в строке:\n"
+            "<code>50000 обед в кафе\n12000 такси</code>",
+        )
+        return
+
+    notes = []
+    if skipped:
+        shown = ", ".join(f"<i>{html.escape(line[:30])}</i>" for line in skipped[:5])
+        notes.append(f"❌ Пропущено: {shown}")
+    if len(lines) > MAX_PASTED_LINES:
+        notes.append(f"Взяты первые {MAX_PASTED_LINES} строк.")
+    await _offer_batch(
+        message,
+        f"Записей: {len(items)}",
+        items,
+        notes,
+        "text",
+        mode,
+        user,
+        session,
+        session_store,
+        category_catalogue,
+    )
@@ -8,8 +8,11 @@ from aiogram import Router
 from aiogram.types import CallbackQuery, Message
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache.category_catalogue import CategoryCatalogue
+from app.cache.report_cache import ReportCache
 from app.cache.session_store import SessionStore
-from app.models.user import User
+from app.cache.user_cache import UserSnapshot
+from app.models.transaction import Transaction
 from app.services.category_service import CategoryService
 from app.services.transaction_service import TransactionService
 from app.utils.formatting import format_amount_short
@@ -20,7 +23,7 @@ router = Router()
 @router.callback_query(lambda c: c.data == "newcat")
 async def on_new_category(
     callback: CallbackQuery,
-    user: User,
+    user: UserSnapshot,
     session_store: SessionStore,
 ) -> None:
     """User wants to create a new category."""
@@ -43,21 +46,20 @@ async def on_new_category(
     await callback.answer()
 
 
-@router.message(lambda m: True)  # This is filtered by priority — see register order
 async def on_new_category_name(
     message: Message,
-    user: User,
+    data: dict,
+    user: UserSnapshot,
     session: AsyncSession,
     session_store: SessionStore,
+    report_cache: ReportCache,
+    category_catalogue: CategoryCatalogue,
 ) -> None:
-    """User typed the name for a new category. Called when is_waiting_category."""
-    if not await session_store.is_waiting_category(user.telegram_id):
-        return  # Not waiting for category name — skip
-
-    data = await session_store.pop_waiting_category(user.telegram_id)
-    if data is None:
-        return
+    """User typed the name for a new category.
 
+    Not a routed handler: `add_transaction.handle_text` reads the waiting state
+    together with the input mode and calls this with the popped `data`.
+    """
     name = (message.text or "").strip()
     if not name or len(name) > 40:
         await session_store.set_waiting_category(user.telegram_id, data)
@@ -65,15 +67,31 @@ async def on_new_category_name(
         return
 
     # Create custom category
-    cat_service = CategoryService(session)
+    cat_service = CategoryService(session, report_cache, category_catalogue)
     category = await cat_service.create_custom(user_id=user.id, name=name)
 
-    # Save the transaction
     entry_type = data.get("entry_type", "expense")
+    tx_service = TransactionService(session, report_cache)
+
+    if "items" in data:
+        transactions = await tx_service.add_transactions(
+            user_id=user.id,
+            type_=entry_type,
+            items=data["items"],
+            category_id=category.id,
+            source=data["source"],
+            tz=user.timezone,
+        )
+        await message.answer(
+            f"✅ Категория <b>{category.label}</b> создана!\n\n"
+            + _batch_summary(entry_type, transactions, category.label),
+        )
+        return
+
+    # Save the transaction
     amount = Decimal(data["amount"])
     currency = data.get("currency", user.default_currency)
 
-    tx_service = TransactionService(session)
     transaction = await tx_service.add_transaction(
         user_id=user.id,
         type_=entry_type,
@@ -82,6 +100,7 @@ async def on_new_category_name(
         category_id=category.id,
         description=data["description"],
         source=data["source"],
+        tz=user.timezone,
     )
 
     type_icon = "🔴" if entry_type == "expense" else "🟢"
@@ -96,9 +115,11 @@ async def on_new_category_name(
 @router.callback_query(lambda c: c.data and c.data.startswith("cat:"))
 async def on_category_chosen(
     callback: CallbackQuery,
-    user: User,
+    user: UserSnapshot,
     session: AsyncSession,
     session_store: SessionStore,
+    report_cache: ReportCache,
+    category_catalogue: CategoryCatalogue,
 ) -> None:
     """Save transaction when user picks a category."""
     category_id = int(callback.data.split(":", 1)[1])
@@ -110,16 +131,32 @@ async def on_category_chosen(
         return
 
     entry_type = expense_data.get("entry_type", "expense")
-    amount = Decimal(expense_data["amount"])
-    currency = expense_data.get("currency", user.default_currency)
 
     # Get category label
-    cat_service = CategoryService(session)
+    cat_service = CategoryService(session, catalogue=category_catalogue)
     category = await cat_service.get_by_id(category_id)
     cat_label = category.label if category else "📦 Другое"
 
+    tx_service = TransactionService(session, report_cache)
+
+    # Album: one pick saves every recognized screenshot
+    if "items" in expense_data:
+        transactions = await tx_service.add_transactions(
+            user_id=user.id,
+            type_=entry_type,
+            items=expense_data["items"],
+            category_id=category_id,
+            source=expense_data["source"],
+            tz=user.timezone,
+        )
+        await callback.message.edit_text(_batch_summary(entry_type, transactions, cat_label))
+        await callback.answer("Сохранено!")
+        return
+
+    amount = Decimal(expense_data["amount"])
+    currency = expense_data.get("currency", user.default_currency)
+
     # Save transaction
-    tx_service = TransactionService(session)
     transaction = await tx_service.add_transaction(
         user_id=user.id,
         type_=entry_type,
@@ -128,6 +165,7 @@ async def on_category_chosen(
         category_id=category_id,
         description=expense_data["description"],
         source=expense_data["source"],
+        tz=user.timezone,
     )
 
     type_icon = "🔴" if entry_type == "expense" else "🟢"
@@ -138,3 +176,18 @@ async def on_category_chosen(
         f"<i>ID: {transaction.id}</i>",
     )
     await callback.answer("Сохранено!")
+
+
+def _batch_summary(entry_type: str, transactions: list[Transaction], cat_label: str) -> str:
+    """Confirmation text for transactions saved together from an album."""
+    type_icon = "🔴" if entry_type == "expense" else "🟢"
+    total = sum(t.amount_base for t in transactions)
+    lines = [
+        f"{type_icon} <b>{format_amount_short(t.amount)}</b> — {t.description}"
+        for t in transactions
+    ]
+    lines.append(
+        f"\nСохранено {len(transactions)} [{cat_label}], "
+        f"итого <b>{format_amount_short(total)}</b>"
+    )
+    return "\n".join(lines)
@@ -2,16 +2,17 @@
 
 from __future__ import annotations
 
-from datetime import datetime
-
 from aiogram import Router
 from aiogram.filters import Command
 from aiogram.types import CallbackQuery, Message
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache.category_catalogue import CategoryCatalogue
+from app.cache.report_cache import ReportCache
+from app.cache.user_cache import UserSnapshot
 from app.keyboards.common import report_type_keyboard
-from app.models.user import User
 from app.services.report_service import ReportService
+from app.utils.dates import now_in
 
 router = Router()
 
@@ -19,20 +20,23 @@ router = Router()
 @router.message(Command("report"))
 async def cmd_report(
     message: Message,
-    user: User,
+    user: UserSnapshot,
     session: AsyncSession,
+    report_cache: ReportCache,
+    category_catalogue: CategoryCatalogue,
     **kwargs,
 ) -> None:
     """Show monthly report — offers text / chart options."""
-    now = datetime.now()
+    now = now_in(user.timezone)
 
-    report_service = ReportService(session)
+    report_service = ReportService(session, report_cache, category_catalogue)
     text = await report_service.build_monthly_text_report(
         user_id=user.id,
         year=now.year,
         month=now.month,
         currency=user.default_currency,
         lang=user.language,
+        tz=user.timezone,
     )
 
     await message.answer(text, reply_markup=report_type_keyboard())
@@ -41,21 +45,24 @@ async def cmd_report(
 @router.callback_query(lambda c: c.data and c.data.startswith("report:"))
 async def on_report_type(
     callback: CallbackQuery,
-    user: User,
+    user: UserSnapshot,
     session: AsyncSession,
+    report_cache: ReportCache,
+    category_catalogue: CategoryCatalogue,
 ) -> None:
     """Handle report type selection."""
     report_type = callback.data.split(":", 1)[1]
-    now = datetime.now()
+    now = now_in(user.timezone)
 
     if report_type == "text":
-        report_service = ReportService(session)
+        report_service = ReportService(session, report_cache, category_catalogue)
         text = await report_service.build_monthly_text_report(
             user_id=user.id,
             year=now.year,
             month=now.month,
             currency=user.default_currency,
             lang=user.language,
+            tz=user.timezone,
         )
         await callback.message.edit_text(text, reply_markup=report_type_keyboard())
         await callback.answer()
@@ -6,12 +6,13 @@ from aiogram import Router
 from aiogram.types import CallbackQuery
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache.report_cache import ReportCache
+from app.cache.user_cache import UserCache, UserSnapshot
 from app.keyboards.settings import (
     currency_keyboard,
     language_keyboard,
     settings_menu_keyboard,
 )
-from app.models.user import User
 from app.services.user_service import UserService
 
 router = Router()
@@ -57,11 +58,13 @@ async def on_settings_back(callback: CallbackQuery) -> None:
 @router.callback_query(lambda c: c.data and c.data.startswith("lang:"))
 async def on_language_chosen(
     callback: CallbackQuery,
-    user: User,
+    user: UserSnapshot,
     session: AsyncSession,
+    user_cache: UserCache,
+    report_cache: ReportCache,
 ) -> None:
     lang = callback.data.split(":", 1)[1]
-    service = UserService(session)
+    service = UserService(session, user_cache, report_cache)
     await service.update_language(user.id, lang)
 
     labels = {"ru": "🇷🇺 Русский", "uz": "🇺🇿 O'zbek", "en": "🇬🇧 English"}
@@ -75,11 +78,13 @@ async def on_language_chosen(
 @router.callback_query(lambda c: c.data and c.data.startswith("cur:"))
 async def on_currency_chosen(
     callback: CallbackQuery,
-    user: User,
+    user: UserSnapshot,
     session: AsyncSession,
+    user_cache: UserCache,
+    report_cache: ReportCache,
 ) -> None:
     currency = callback.data.split(":", 1)[1]
-    service = UserService(session)
+    service = UserService(session, user_cache, report_cache)
     await service.update_currency(user.id, currency)
 
     await callback.message.edit_text(
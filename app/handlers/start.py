@@ -12,6 +12,7 @@ from aiogram.types import (
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.cache.session_store import SessionStore
+from app.cache.user_cache import UserCache, UserSnapshot
 from app.keyboards.main_menu import (
     BTN_EXPENSE,
     BTN_INCOME,
@@ -19,7 +20,6 @@ from app.keyboards.main_menu import (
     BTN_SETTINGS,
     main_keyboard,
 )
-from app.models.user import User
 from app.services.user_service import UserService
 
 router = Router()
@@ -51,7 +51,7 @@ register_keyboard = ReplyKeyboardMarkup(
 
 @router.message(CommandStart())
 async def cmd_start(
-    message: Message, user: User, session_store: SessionStore
+    message: Message, user: UserSnapshot, session_store: SessionStore
 ) -> None:
     if not user.is_registered:
         await message.answer(
@@ -73,9 +73,10 @@ async def cmd_start(
 @router.message(F.contact)
 async def on_contact_shared(
     message: Message,
-    user: User,
+    user: UserSnapshot,
     session: AsyncSession,
     session_store: SessionStore,
+    user_cache: UserCache,
 ) -> None:
     """User shared their phone number — complete registration."""
     contact = message.contact
@@ -94,7 +95,7 @@ async def on_contact_shared(
         phone = f"+{phone}"
 
     # Save phone and mark as registered
-    service = UserService(session)
+    service = UserService(session, user_cache)
     await service.complete_registration(user.id, phone)
 
     await session_store.set_mode(user.telegram_id, "expense")
@@ -106,7 +107,7 @@ async def on_contact_shared(
 
 
 @router.message(Command("help"))
-async def cmd_help(message: Message, user: User) -> None:
+async def cmd_help(message: Message, user: UserSnapshot) -> None:
     if not user.is_registered:
         await message.answer(
             "Сначала пройди регистрацию — нажми /start",
@@ -118,7 +119,7 @@ async def cmd_help(message: Message, user: User) -> None:
 
 @router.message(F.text == BTN_EXPENSE)
 async def on_expense_mode(
-    message: Message, user: User, session_store: SessionStore
+    message: Message, user: UserSnapshot, session_store: SessionStore
 ) -> None:
     await session_store.set_mode(user.telegram_id, "expense")
     await message.answer("🔴 Режим <b>расхода</b>. Напиши сумму и описание:")
@@ -126,14 +127,14 @@ async def on_expense_mode(
 
 @router.message(F.text == BTN_INCOME)
 async def on_income_mode(
-    message: Message, user: User, session_store: SessionStore
+    message: Message, user: UserSnapshot, session_store: SessionStore
 ) -> None:
     await session_store.set_mode(user.telegram_id, "income")
     await message.answer("🟢 Режим <b>прихода</b>. Напиши сумму и описание:")
 
 
 @router.message(F.text == BTN_REPORT)
-async def on_report_button(message: Message, user: User, **kwargs) -> None:
+async def on_report_button(message: Message, user: UserSnapshot, **kwargs) -> None:
     """Delegate to /report handler."""
     from app.handlers.reports import cmd_report
 
@@ -1,40 +1,54 @@
-"""Category selection inline keyboard."""
+"""Category selection inline keyboard.
+
+Keyboards are memoized: the same category set always yields the same
+InlineKeyboardMarkup object. The default-category grid is built once per
+catalogue and shared by every user; custom categories get their own rows
+below it, so a user's custom set never forces the default grid to be rebuilt.
+"""
 
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Sequence
 
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
-from app.models.category import Category
+from app.cache.category_catalogue import CategorySnapshot
+
+# (category id, label) pairs — everything a button is built from
+_Key = tuple[tuple[int, str], ...]
 
+NEW_CATEGORY_ROW = (
+    InlineKeyboardButton(text="➕ Новая категория", callback_data="newcat"),
+)
 
-def build_category_keyboard(categories: Sequence[Category]) -> InlineKeyboardMarkup:
+
+def build_category_keyboard(categories: Sequence[CategorySnapshot]) -> InlineKeyboardMarkup:
     """Build inline keyboard with categories in 2-column grid + 'New category' button.
 
     Args:
-        categories: List of Category objects.
+        categories: Categories to show (defaults first, then custom).
 
     Returns:
-        InlineKeyboardMarkup with category buttons.
+        InlineKeyboardMarkup with category buttons. The object is shared
+        between calls and must not be mutated.
     """
-    buttons: list[list[InlineKeyboardButton]] = []
-    items = list(categories)
-
-    for i in range(0, len(items), 2):
-        row = []
-        for cat in items[i : i + 2]:
-            row.append(
-                InlineKeyboardButton(
-                    text=cat.label,
-                    callback_data=f"cat:{cat.id}",
-                )
-            )
-        buttons.append(row)
-
-    # Add "New category" button at the bottom
-    buttons.append(
-        [InlineKeyboardButton(text="➕ Новая категория", callback_data="newcat")]
-    )
-
-    return InlineKeyboardMarkup(inline_keyboard=buttons)
+    defaults = tuple((c.id, c.label) for c in categories if c.is_default)
+    custom = tuple((c.id, c.label) for c in categories if not c.is_default)
+    return _markup(defaults, custom)
+
+
+@lru_cache(maxsize=1024)
+def _markup(defaults: _Key, custom: _Key) -> InlineKeyboardMarkup:
+    rows = [*_grid(defaults), *_grid(custom), NEW_CATEGORY_ROW]
+    return InlineKeyboardMarkup(inline_keyboard=[list(row) for row in rows])
+
+
+@lru_cache(maxsize=64)
+def _grid(items: _Key) -> tuple[tuple[InlineKeyboardButton, ...], ...]:
+    """Buttons for `items` in rows of two."""
+    buttons = [
+        InlineKeyboardButton(text=label, callback_data=f"cat:{category_id}")
+        for category_id, label in items
+    ]
+    return tuple(tuple(buttons[i : i + 2]) for i in range(0, len(buttons), 2))
@@ -8,23 +8,42 @@ from __future__ import annotations
 import asyncio
 import logging
 import sys
+from collections.abc import Awaitable, Callable
 
+import sqlalchemy
 import structlog
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 
-from app.cache.rate_limiter import RateLimiter
+from app.cache.category_catalogue import CategoryCatalogue
+from app.cache.ocr_cache import OCRCache
+from app.cache.rate_limiter import Limit, LocalRateLimiter, RateLimiter
 from app.cache.redis_client import close_redis, get_redis
-from app.cache.session_store import SessionStore
+from app.cache.report_cache import ReportCache
+from app.cache.session_store import REDIS_FAILURES, SessionStore
+from app.cache.user_cache import UserCache
 from app.config import get_settings
 from app.db.engine import engine
+from app.db.pool_metrics import report_pool_stats
+from app.db.session import get_session
 from app.handlers import register_all_routers
-from app.middlewares.auth import AuthMiddleware
-from app.middlewares.db_session import DbSessionMiddleware
+from app.middlewares.album import AlbumMiddleware
 from app.middlewares.logging_mw import LoggingMiddleware
 from app.middlewares.rate_limit import RateLimitMiddleware
 from app.middlewares.registration import RegistrationMiddleware
+from app.middlewares.send_scheduler import SendScheduler
+from app.middlewares.unit_of_work import DB_FAILURES, UnitOfWorkMiddleware
+from app.services.category_service import CategoryService
+from app.services.ocr_service import OCRPool, OCRService
+from app.updates import (
+    QueuedRequestHandler,
+    StreamConsumer,
+    UpdatePoller,
+    UpdateStream,
+    UpdateWorkerPool,
+)
+from app.utils.circuit_breaker import CircuitBreaker
 
 
 def setup_logging(log_level: str) -> None:
@@ -60,8 +79,92 @@ def _run_alembic_upgrade(connection, alembic_cfg) -> None:
     command.upgrade(alembic_cfg, "head")
 
 
-async def on_startup(bot: Bot) -> None:
-    """Run on bot startup — initialize DB, Redis, run migrations."""
+# pg_advisory_lock key held while migrating and seeding ("ulafin" in ASCII)
+MIGRATION_LOCK_ID = 0x756C6166696E
+
+
+async def prepare_database(migrate: bool = True) -> None:
+    """Run migrations and seed reference data, one process at a time.
+
+    The work runs under a Postgres advisory lock, so processes starting together
+    never race the DDL or the check-then-insert seeding. With ``migrate=False``
+    (stream workers) it runs nothing: it waits until the schema is at the
+    migration head and no seeding holds the lock.
+    """
+    if not migrate:
+        await _wait_for_migrations()
+
+    async with engine.connect() as lock_conn:
+        await lock_conn.execute(
+            sqlalchemy.text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID}
+        )
+        try:
+            if not migrate:
+                return
+
+            # Run Alembic migrations (async-safe — avoids nested asyncio.run)
+            print("[STARTUP] Running migrations...", flush=True)
+            from alembic.config import Config
+
+            alembic_cfg = Config("alembic.ini")
+
+            # Run migrations using an existing async connection passed into env.py
+            async with engine.begin() as conn:
+                await conn.run_sync(
+                    lambda sync_conn: _run_alembic_upgrade(sync_conn, alembic_cfg)
+                )
+            print("[STARTUP] Migrations complete", flush=True)
+
+            # Seed default categories if empty
+            from scripts.seed_categories import seed as seed_categories
+            from scripts.seed_currencies import seed as seed_currencies
+
+            await seed_categories()
+            await seed_currencies()
+        finally:
+            await lock_conn.execute(
+                sqlalchemy.text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID}
+            )
+
+
+async def _wait_for_migrations(interval: float = 2.0) -> None:
+    """Poll alembic_version until it matches the head of the migration scripts."""
+    from alembic.config import Config
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    heads = set(ScriptDirectory.from_config(Config("alembic.ini")).get_heads())
+    while True:
+        async with engine.connect() as conn:
+            current = await conn.run_sync(
+                lambda sync_conn: set(MigrationContext.configure(sync_conn).get_current_heads())
+            )
+        if current == heads:
+            return
+        print(
+            f"[STARTUP] Waiting for migrations: at {sorted(current)}, head {sorted(heads)}",
+            flush=True,
+        )
+        await asyncio.sleep(interval)
+
+
+async def load_category_catalogue(catalogue: CategoryCatalogue) -> None:
+    """Fill the in-process catalogue with default categories from the DB."""
+    async with get_session() as session:
+        await CategoryService(session, catalogue=catalogue).reload_catalogue()
+
+
+async def on_startup(
+    bot: Bot,
+    dispatcher: Dispatcher,
+    category_catalogue: CategoryCatalogue,
+    ocr_pool: OCRPool,
+) -> None:
+    """Run on bot startup — initialize DB, Redis, run migrations.
+
+    Stream workers leave migrations and seeding to the ingress process and
+    only load the catalogue, start listeners and warm up OCR.
+    """
     print("[STARTUP] on_startup begin", flush=True)
 
     # Initialize Redis
@@ -71,41 +174,54 @@ async def on_startup(bot: Bot) -> None:
 
     # Verify database connection
     async with engine.begin() as conn:
-        await conn.execute(__import__("sqlalchemy").text("SELECT 1"))
+        await conn.execute(sqlalchemy.text("SELECT 1"))
     print("[STARTUP] Database connected", flush=True)
 
-    # Run Alembic migrations (async-safe — avoids nested asyncio.run)
-    print("[STARTUP] Running migrations...", flush=True)
-    from alembic.config import Config
+    await prepare_database(migrate=get_settings().run_mode != "worker")
 
-    alembic_cfg = Config("alembic.ini")
-
-    # Run migrations using an existing async connection passed into env.py
-    async with engine.begin() as conn:
-        await conn.run_sync(
-            lambda sync_conn: _run_alembic_upgrade(sync_conn, alembic_cfg)
-        )
-    print("[STARTUP] Migrations complete", flush=True)
-
-    # Seed default categories if empty
-    from scripts.seed_categories import seed as seed_categories
-    from scripts.seed_currencies import seed as seed_currencies
-
-    await seed_categories()
-    await seed_currencies()
+    # Default categories live in process memory; reseeds trigger a reload
+    await load_category_catalogue(category_catalogue)
+    dispatcher["catalogue_listener"] = asyncio.create_task(
+        category_catalogue.listen(lambda: load_category_catalogue(category_catalogue))
+    )
+    await ocr_pool.warm_up()
+    dispatcher["pool_reporter"] = asyncio.create_task(report_pool_stats(engine))
 
     me = await bot.get_me()
     print(f"[STARTUP] Bot started: @{me.username} (id={me.id})", flush=True)
 
 
-async def on_shutdown(bot: Bot) -> None:
+async def on_shutdown(bot: Bot, dispatcher: Dispatcher, ocr_pool: OCRPool) -> None:
     """Clean up on shutdown."""
     log = structlog.get_logger()
+    for task_name in ("catalogue_listener", "pool_reporter"):
+        task = dispatcher.workflow_data.get(task_name)
+        if task is not None:
+            task.cancel()
+    ocr_pool.shutdown()
     await close_redis()
     await engine.dispose()
     log.info("bot_stopped")
 
 
+async def run_with_pool(
+    bot: Bot, dp: Dispatcher, pool: UpdateWorkerPool, receive: Callable[[], Awaitable[None]]
+) -> None:
+    """Handle updates that `receive` feeds into `pool`, with startup/shutdown hooks.
+
+    Replaces ``dp.start_polling`` for the poller and the stream consumer; on
+    exit the pool drains before the shutdown hooks close Redis and the DB.
+    """
+    workflow_data = {"dispatcher": dp, "bots": [bot], **dp.workflow_data}
+    await dp.emit_startup(bot=bot, **workflow_data)
+    pool.start()
+    try:
+        await receive()
+    finally:
+        await pool.stop()
+        await dp.emit_shutdown(bot=bot, **workflow_data)
+
+
 async def main() -> None:
     settings = get_settings()
     setup_logging(settings.log_level)
@@ -115,6 +231,15 @@ async def main() -> None:
         token=settings.bot_token,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
+    # All sends are paced here; stream workers split the bot-wide rate
+    workers = settings.stream_worker_count if settings.run_mode == "worker" else 1
+    bot.session.middleware(
+        SendScheduler(
+            global_rate=settings.send_rate_global / workers,
+            per_chat=settings.send_rate_per_chat,
+            chat_burst=settings.send_chat_burst,
+        )
+    )
 
     dp = Dispatcher()
     dp.startup.register(on_startup)
@@ -122,48 +247,105 @@ async def main() -> None:
 
     # ── Initialize Redis services ─────────────────────────────
     redis = await get_redis()
-    session_store = SessionStore(redis)
-    rate_limiter = RateLimiter(redis)
+    # Shed load with a "busy" reply once Postgres / Redis keep failing
+    db_breaker = CircuitBreaker(
+        "postgres", DB_FAILURES, settings.breaker_threshold, settings.breaker_reset
+    )
+    redis_breaker = CircuitBreaker(
+        "redis", REDIS_FAILURES, settings.breaker_threshold, settings.breaker_reset
+    )
+    session_store = SessionStore(redis, redis_breaker, timeout=settings.redis_timeout)
+    rate_limits = {
+        "message": Limit(settings.rate_limit_messages, burst=settings.rate_limit_messages_burst),
+        "callback": Limit(
+            settings.rate_limit_callbacks, burst=settings.rate_limit_callbacks_burst
+        ),
+        "photo": Limit(settings.rate_limit_photos, burst=settings.rate_limit_photos_burst),
+    }
+    rate_limiter = RateLimiter(redis, rate_limits)
+    local_rate_limiter = LocalRateLimiter(rate_limits)
+    user_cache = UserCache(redis)
+    report_cache = ReportCache(redis)
+    category_catalogue = CategoryCatalogue(redis)
+
+    # ── OCR process pool ──────────────────────────────────────
+    ocr_pool = OCRPool(
+        workers=settings.ocr_workers,
+        max_pending=settings.ocr_max_pending,
+        timeout=settings.ocr_timeout,
+    )
 
     # ── Register middlewares (order: outer → inner) ───────────
-    # Logging → Rate limit → Auth → DB Session
+    # Logging → Album → Rate limit → Unit of work (session + user) → Registration
     dp.message.middleware(LoggingMiddleware())
     dp.callback_query.middleware(LoggingMiddleware())
 
-    dp.message.middleware(RateLimitMiddleware(rate_limiter))
-    dp.callback_query.middleware(RateLimitMiddleware(rate_limiter))
+    # Media groups reach the handlers once, as data["album"]
+    dp.message.middleware(AlbumMiddleware())
 
-    dp.message.middleware(AuthMiddleware())
-    dp.callback_query.middleware(AuthMiddleware())
+    dp.message.middleware(RateLimitMiddleware(rate_limiter, local_rate_limiter))
+    dp.callback_query.middleware(RateLimitMiddleware(rate_limiter, local_rate_limiter))
 
-    dp.message.middleware(DbSessionMiddleware())
-    dp.callback_query.middleware(DbSessionMiddleware())
+    dp.message.middleware(UnitOfWorkMiddleware(user_cache, breaker=db_breaker))
+    dp.callback_query.middleware(UnitOfWorkMiddleware(user_cache, breaker=db_breaker))
 
     dp.message.middleware(RegistrationMiddleware())
     dp.callback_query.middleware(RegistrationMiddleware())
 
-    # ── Inject session_store into all handlers ────────────────
+    # ── Inject Redis stores into all handlers ─────────────────
     dp["session_store"] = session_store
+    dp["user_cache"] = user_cache
+    dp["report_cache"] = report_cache
+    dp["category_catalogue"] = category_catalogue
+    dp["ocr_pool"] = ocr_pool
+    dp["ocr_service"] = OCRService(
+        ocr_pool, OCRCache(redis), crop=settings.ocr_crop_amount_region
+    )
 
     # ── Register routers ──────────────────────────────────────
     register_all_routers(dp)
 
-    if settings.use_webhook:
+    # single: this process receives and handles updates
+    # ingress: receive only, into the Redis streams; worker: handle only
+    pool = UpdateWorkerPool(
+        dp,
+        bot,
+        workers=settings.update_workers,
+        slow_workers=settings.update_slow_workers,
+        max_queued=settings.update_queue_size,
+    )
+    ingress = settings.run_mode == "ingress"
+    sink = UpdateStream(redis, settings.stream_partitions) if ingress else pool
+    if ingress:
+        # No dispatcher startup here — migrate before workers see any update
+        await prepare_database()
+
+    if settings.run_mode == "worker":
+        log.info("starting_stream_worker", index=settings.stream_worker_index)
+        consumer = StreamConsumer(
+            redis,
+            pool,
+            partitions=settings.stream_partitions,
+            index=settings.stream_worker_index,
+            count=settings.stream_worker_count,
+        )
+        await run_with_pool(bot, dp, pool, consumer.run)
+    elif settings.use_webhook:
         log.info("starting_webhook", url=settings.webhook_url)
         from aiohttp import web
-        from aiogram.webhook.aiohttp_server import (
-            SimpleRequestHandler,
-            setup_application,
-        )
+        from aiogram.webhook.aiohttp_server import setup_application
 
         await bot.set_webhook(
             url=settings.webhook_url,
             secret_token=settings.webhook_secret,
         )
+        # Requests are answered as soon as the update is queued; workers
+        # handle it afterwards, in order per user
         app = web.Application()
-        handler = SimpleRequestHandler(dispatcher=dp, bot=bot)
+        handler = QueuedRequestHandler(sink, secret_token=settings.webhook_secret)
         handler.register(app, path="/webhook")
-        setup_application(app, dp, bot=bot)
+        if not ingress:
+            setup_application(app, dp, bot=bot)
 
         runner = web.AppRunner(app)
         await runner.setup()
@@ -173,11 +355,20 @@ async def main() -> None:
             "webhook_running", host=settings.webhook_host, port=settings.webhook_port
         )
 
-        # Keep running
-        await asyncio.Event().wait()
+        # Keep running; on exit drain the queue, then run the shutdown hooks
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
     else:
-        print("[MAIN] Starting polling...", flush=True)
-        await dp.start_polling(bot)
+        # Not dp.start_polling: it starts a task per update with no bound
+        poller = UpdatePoller(bot, sink, allowed_updates=dp.resolve_used_update_types())
+        if ingress:
+            log.info("starting_polling_ingress", partitions=settings.stream_partitions)
+            await poller.run()
+        else:
+            print("[MAIN] Starting polling...", flush=True)
+            await run_with_pool(bot, dp, pool, poller.run)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,47 @@
+"""Album middleware — deliver a media group to the handler once, as a list.
+
+Telegram sends every photo of an album as its own update with a shared
+`media_group_id`. The first one waits `latency` seconds for the rest, then
+goes on with ``data["album"]`` holding all messages in order; the others stop
+here. Must run before rate limiting so an album counts as one request.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import Message, TelegramObject
+
+
+class AlbumMiddleware(BaseMiddleware):
+    """Collect media-group messages and hand them to one handler call."""
+
+    def __init__(self, latency: float = 0.8) -> None:
+        self._latency = latency
+        self._albums: dict[str, list[Message]] = {}
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if not isinstance(event, Message) or not event.media_group_id:
+            return await handler(event, data)
+
+        album = self._albums.get(event.media_group_id)
+        if album is not None:
+            album.append(event)
+            return None
+
+        self._albums[event.media_group_id] = album = [event]
+        try:
+            await asyncio.sleep(self._latency)
+        finally:
+            del self._albums[event.media_group_id]
+
+        album.sort(key=lambda m: m.message_id)
+        data["album"] = album
+        return await handler(album[0], data)
@@ -1,34 +0,0 @@
-"""Database session middleware — injects AsyncSession into handler data.
-
-Usage in handlers:
-    async def my_handler(message: Message, session: AsyncSession, ...):
-"""
-
-from __future__ import annotations
-
-from typing import Any, Awaitable, Callable
-
-from aiogram import BaseMiddleware
-from aiogram.types import TelegramObject
-
-from app.db.engine import async_session_factory
-
-
-class DbSessionMiddleware(BaseMiddleware):
-    """Inject a fresh AsyncSession into every handler."""
-
-    async def __call__(
-        self,
-        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
-        event: TelegramObject,
-        data: dict[str, Any],
-    ) -> Any:
-        async with async_session_factory() as session:
-            data["session"] = session
-            try:
-                result = await handler(event, data)
-                await session.commit()
-                return result
-            except Exception:
-                await session.rollback()
-                raise
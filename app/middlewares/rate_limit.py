@@ -1,22 +1,22 @@
-"""Rate limiting middleware — Redis-based per-user throttling."""
+"""Rate limiting middleware — per-user throttling, local pre-filter + Redis."""
 
 from __future__ import annotations
 
+import math
 from typing import Any, Awaitable, Callable
 
 from aiogram import BaseMiddleware
 from aiogram.types import CallbackQuery, Message, TelegramObject
 
-from app.cache.rate_limiter import RateLimiter
+from app.cache.rate_limiter import LocalRateLimiter, RateLimiter
 
 
 class RateLimitMiddleware(BaseMiddleware):
-    """Throttle users who send too many messages."""
+    """Throttle users who send too many messages, callbacks or photos."""
 
-    def __init__(self, limiter: RateLimiter, limit: int = 30, window: int = 60) -> None:
+    def __init__(self, limiter: RateLimiter, local: LocalRateLimiter | None = None) -> None:
         self._limiter = limiter
-        self._limit = limit
-        self._window = window
+        self._local = local or LocalRateLimiter()
 
     async def __call__(
         self,
@@ -25,24 +25,36 @@ class RateLimitMiddleware(BaseMiddleware):
         data: dict[str, Any],
     ) -> Any:
         user_id: int | None = None
+        kind = "message"
 
         if isinstance(event, Message) and event.from_user:
             user_id = event.from_user.id
+            if event.photo:
+                kind = "photo"
         elif isinstance(event, CallbackQuery) and event.from_user:
             user_id = event.from_user.id
+            kind = "callback"
 
         if user_id is not None:
-            allowed = await self._limiter.is_allowed(
-                user_id, self._limit, self._window
-            )
-            if not allowed:
+            # Floods are rejected in process; only plausible traffic reaches Redis
+            result = self._local.check(user_id, kind)
+            if result.allowed:
+                result = await self._limiter.hit(user_id, kind)
+                if not result.allowed:
+                    self._local.block(user_id, kind, result.retry_after)
+
+            if not result.allowed:
+                # One notice per throttling period, so a flood in is not a flood out
+                if not self._local.should_notify(user_id, result.retry_after):
+                    return None
+                wait = math.ceil(result.retry_after)
                 if isinstance(event, Message):
                     await event.answer(
-                        "⏳ Слишком много запросов. Подождите немного."
+                        f"⏳ Слишком много запросов. Подождите {wait} сек."
                     )
                 elif isinstance(event, CallbackQuery):
                     await event.answer(
-                        "⏳ Подождите немного.", show_alert=True
+                        f"⏳ Подождите {wait} сек.", show_alert=True
                     )
                 return None
 
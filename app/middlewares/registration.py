@@ -10,7 +10,7 @@ from typing import Any, Awaitable, Callable
 from aiogram import BaseMiddleware
 from aiogram.types import CallbackQuery, Message, TelegramObject
 
-from app.models.user import User
+from app.cache.user_cache import UserSnapshot
 
 
 class RegistrationMiddleware(BaseMiddleware):
@@ -22,7 +22,7 @@ class RegistrationMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: dict[str, Any],
     ) -> Any:
-        user: User | None = data.get("user")
+        user: UserSnapshot | None = data.get("user")
 
         if user is None or user.is_registered:
             return await handler(event, data)
@@ -0,0 +1,243 @@
+"""Send scheduler — every outgoing Telegram message paced in one place.
+
+A request middleware on the bot session, so handlers keep calling
+``message.answer`` / ``edit_text`` and still go through it. Telegram allows
+about 30 messages per second per bot and about one per second per chat; going
+over gets 429s with a ``retry_after``.
+
+- Per chat: a GCRA slot reservation (rate `per_chat`, `chat_burst` back to back),
+  taken in call order, so a chat's messages keep their order.
+- Global: a priority pump releases one send per 1/`global_rate` seconds,
+  interactive replies first, then BULK (broadcasts, reminder fan-out — wrap
+  them in ``bulk_sends()``).
+- 429: the chat is paused for `retry_after` and the call retried, up to
+  `max_retries` times.
+- ``edit_text`` on a message with an edit already waiting for its slot does not
+  queue a second edit: the waiting one is sent with the newest content and
+  both callers get its result.
+
+Methods without a chat (callback answers, getFile, ...) and chat actions pass
+straight through.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import TYPE_CHECKING, Any
+
+import structlog
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import EditMessageText, SendChatAction
+from aiogram.methods.base import TelegramType
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+    from aiogram.methods import Response, TelegramMethod
+
+log = structlog.get_logger()
+
+PACED_PREFIXES = ("Send", "Edit", "Copy", "Forward")
+MAX_TRACKED_CHATS = 10_000
+
+
+class Lane(IntEnum):
+    """Send priority; lower goes first."""
+
+    INTERACTIVE = 0
+    BULK = 1
+
+
+_lane: contextvars.ContextVar[Lane] = contextvars.ContextVar(
+    "send_lane", default=Lane.INTERACTIVE
+)
+
+
+@contextmanager
+def bulk_sends() -> Iterator[None]:
+    """Send everything inside this block in the BULK lane."""
+    token = _lane.set(Lane.BULK)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+@dataclass(slots=True)
+class _PendingEdit:
+    method: EditMessageText
+    result: asyncio.Future[Any]
+    waiters: int = 0
+
+
+@dataclass(order=True, slots=True)
+class _Ticket:
+    lane: Lane
+    seq: int
+    future: asyncio.Future[None] = field(compare=False)
+
+
+class SendScheduler(BaseRequestMiddleware):
+    """Pace sends to Telegram's global and per-chat flood limits."""
+
+    def __init__(
+        self,
+        global_rate: float = 30.0,
+        per_chat: float = 1.0,
+        chat_burst: int = 3,
+        max_retries: int = 3,
+    ) -> None:
+        self._global_interval = 1 / global_rate
+        self._chat_interval = 1 / per_chat
+        self._chat_burst = chat_burst
+        self._max_retries = max_retries
+
+        self._chat_tat: dict[int | str, float] = {}  # theoretical arrival time per chat
+        self._edits: dict[tuple[int | str, int], _PendingEdit] = {}
+        self._tickets: list[_Ticket] = []
+        self._seq = itertools.count()
+        self._next_global = 0.0
+        self._pump: asyncio.Task[None] | None = None
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        if (
+            chat_id is None
+            or isinstance(method, SendChatAction)
+            or not type(method).__name__.startswith(PACED_PREFIXES)
+        ):
+            return await make_request(bot, method)
+
+        if isinstance(method, EditMessageText) and method.message_id is not None:
+            return await self._edit(make_request, bot, method, chat_id)
+        return await self._send(make_request, bot, method, chat_id)
+
+    async def _send(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+        chat_id: int | str,
+        waited: bool = False,
+    ) -> Response[TelegramType]:
+        if not waited:
+            await self._wait_turn(chat_id)
+        retries = 0
+        while True:
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                retries += 1
+                if retries > self._max_retries:
+                    raise
+                log.warning(
+                    "send_retry_after",
+                    method=type(method).__name__,
+                    chat_id=chat_id,
+                    retry_after=e.retry_after,
+                )
+                self._pause_chat(chat_id, e.retry_after)
+                await self._wait_turn(chat_id)
+
+    async def _edit(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: EditMessageText,
+        chat_id: int | str,
+    ) -> Response[TelegramType]:
+        key = (chat_id, method.message_id)
+        pending = self._edits.get(key)
+        if pending is not None:
+            # Superseded before it was sent: send only the newest text
+            pending.method = method
+            pending.waiters += 1
+            return await asyncio.shield(pending.result)
+
+        pending = _PendingEdit(method, asyncio.get_running_loop().create_future())
+        self._edits[key] = pending
+        try:
+            try:
+                await self._wait_turn(chat_id)
+            finally:
+                # From here on a new edit is a new request, not a replacement
+                del self._edits[key]
+            response = await self._send(make_request, bot, pending.method, chat_id, waited=True)
+        except BaseException as e:
+            if pending.waiters:
+                if isinstance(e, Exception):
+                    pending.result.set_exception(e)
+                else:
+                    pending.result.cancel()
+            raise
+        if pending.waiters:
+            pending.result.set_result(response)
+        return response
+
+    # ── Pacing ────────────────────────────────────────────────
+
+    async def _wait_turn(self, chat_id: int | str) -> None:
+        started = time.monotonic()
+        await self._wait_chat(chat_id)
+        await self._wait_global(_lane.get())
+        waited = time.monotonic() - started
+        if waited > 1.0:
+            log.info("send_delayed", chat_id=chat_id, waited_ms=round(waited * 1000))
+
+    async def _wait_chat(self, chat_id: int | str) -> None:
+        """Reserve the chat's next slot (GCRA) and sleep until it."""
+        now = time.monotonic()
+        if len(self._chat_tat) > MAX_TRACKED_CHATS:
+            self._chat_tat = {c: t for c, t in self._chat_tat.items() if t > now}
+        tat = max(self._chat_tat.get(chat_id, now), now) + self._chat_interval
+        self._chat_tat[chat_id] = tat
+        delay = tat - self._chat_burst * self._chat_interval - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _pause_chat(self, chat_id: int | str, seconds: float) -> None:
+        resume = time.monotonic() + seconds
+        # Keep the burst allowance from letting a send through before `resume`
+        self._chat_tat[chat_id] = max(
+            self._chat_tat.get(chat_id, 0.0),
+            resume + (self._chat_burst - 1) * self._chat_interval,
+        )
+
+    async def _wait_global(self, lane: Lane) -> None:
+        now = time.monotonic()
+        if not self._tickets and now >= self._next_global:
+            self._next_global = now + self._global_interval
+            return
+
+        ticket = _Ticket(lane, next(self._seq), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._tickets, ticket)
+        if self._pump is None or self._pump.done():
+            self._pump = asyncio.create_task(self._run_pump())
+        await ticket.future
+
+    async def _run_pump(self) -> None:
+        while self._tickets:
+            delay = self._next_global - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            ticket = heapq.heappop(self._tickets)
+            if ticket.future.done():  # caller was cancelled
+                continue
+            ticket.future.set_result(None)
+            self._next_global = max(self._next_global, time.monotonic()) + self._global_interval
@@ -0,0 +1,115 @@
+"""Unit-of-work middleware — one AsyncSession per update.
+
+Opens a single session, resolves (or auto-registers) the Telegram user in it
+and hands the very same session to the handler. The whole update runs in one
+transaction and is committed once at the end, so a typical update costs one
+pool checkout instead of two.
+
+The user is resolved through UserCache first; on a hit no query is issued and,
+since AsyncSession connects lazily, handlers that don't touch the DB cost zero
+round trips to Postgres.
+
+With a circuit breaker the update is shed instead: when no connection frees
+up within the pool timeout, or Postgres keeps failing, or anything in the
+handler raises ServiceBusyError (e.g. SessionStore with Redis down), the user
+gets a short "busy" reply rather than silence or a generic error. Only
+database errors count as failures, and only the commit (plus a SELECT 1 when
+the breaker is half-open) runs inside the breaker, so other handler errors
+(downloads, OCR) and slow handlers never trip it or hold up its probe.
+
+Usage in handlers:
+    async def my_handler(message: Message, user: UserSnapshot, session: AsyncSession, ...):
+"""
+
+from __future__ import annotations
+
+from contextlib import AbstractAsyncContextManager, nullcontext
+from typing import Any, Awaitable, Callable
+
+import sqlalchemy
+import structlog
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, Message, TelegramObject
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.cache.user_cache import UserCache
+from app.db.engine import async_session_factory
+from app.services.user_service import UserService
+from app.utils.circuit_breaker import CircuitBreaker, ServiceBusyError
+
+log = structlog.get_logger()
+
+# Errors that mean "Postgres is unavailable", not "this update is bad"
+DB_FAILURES: tuple[type[BaseException], ...] = (
+    sa_exc.TimeoutError,  # no free connection within pool_timeout
+    sa_exc.OperationalError,
+    sa_exc.InterfaceError,
+)
+
+BUSY_TEXT = "⏳ Бот сейчас перегружен. Попробуйте ещё раз через минуту."
+
+
+class UnitOfWorkMiddleware(BaseMiddleware):
+    """Inject `session` and `user` into handler data from one transaction."""
+
+    def __init__(
+        self,
+        user_cache: UserCache | None = None,
+        session_factory: async_sessionmaker[AsyncSession] = async_session_factory,
+        breaker: CircuitBreaker | None = None,
+    ) -> None:
+        self._user_cache = user_cache
+        self._session_factory = session_factory
+        self._breaker = breaker
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        tg_user = None
+        if isinstance(event, (Message, CallbackQuery)) and event.from_user:
+            tg_user = event.from_user
+
+        try:
+            async with self._session_factory() as session:
+                data["session"] = session
+                try:
+                    try:
+                        if self._breaker is not None and self._breaker.is_open:
+                            # Shed, or be the half-open probe with a real round trip
+                            async with self._breaker.guard():
+                                await session.execute(sqlalchemy.text("SELECT 1"))
+                        if tg_user is not None:
+                            service = UserService(session, self._user_cache)
+                            data["user"] = await service.resolve(
+                                telegram_id=tg_user.id,
+                                username=tg_user.username,
+                                first_name=tg_user.first_name,
+                            )
+                        result = await handler(event, data)
+                    except DB_FAILURES as e:
+                        if self._breaker is None:
+                            raise
+                        raise self._breaker.failed(e) from e
+                    if session.in_transaction():
+                        async with self._guard():
+                            await session.commit()
+                    return result
+                except Exception:
+                    await session.rollback()
+                    raise
+        except ServiceBusyError as e:
+            log.warning("update_shed", dependency=str(e))
+            if isinstance(event, Message):
+                await event.answer(BUSY_TEXT)
+            elif isinstance(event, CallbackQuery):
+                await event.answer(BUSY_TEXT, show_alert=True)
+            return None
+
+    def _guard(self) -> AbstractAsyncContextManager[Any]:
+        if self._breaker is None:
+            return nullcontext()
+        return self._breaker.guard()
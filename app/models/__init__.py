@@ -1,4 +1,11 @@
-"""SQLAlchemy ORM models."""
+"""SQLAlchemy ORM models.
+
+Loading policy: every relationship is declared ``lazy="raise"``. Nothing is
+loaded implicitly when a row is fetched (the user row used to drag the whole
+transaction history along), and an accidental lazy load fails loudly instead
+of emitting hidden queries. Queries that need related rows ask for them
+explicitly with ``selectinload()`` / ``joinedload()`` options.
+"""
 
 from app.models.user import User
 from app.models.category import Category
@@ -7,6 +14,7 @@ from app.models.transaction import Transaction
 from app.models.family import Family, FamilyMember, FamilyInvite
 from app.models.budget import Budget, BudgetAlert
 from app.models.reminder import Reminder
+from app.models.rollup import MonthlyRollup
 
 __all__ = [
     "User",
@@ -20,4 +28,5 @@ __all__ = [
     "Budget",
     "BudgetAlert",
     "Reminder",
+    "MonthlyRollup",
 ]
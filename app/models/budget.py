@@ -44,10 +44,10 @@ class Budget(Base):
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
 
     # Relationships
-    user: Mapped["User"] = relationship()  # noqa: F821
-    category: Mapped["Category | None"] = relationship()  # noqa: F821
+    user: Mapped["User"] = relationship(lazy="raise")  # noqa: F821
+    category: Mapped["Category | None"] = relationship(lazy="raise")  # noqa: F821
     alerts: Mapped[list["BudgetAlert"]] = relationship(
-        back_populates="budget", lazy="selectin"
+        back_populates="budget", lazy="raise", passive_deletes=True
     )
 
     def __repr__(self) -> str:
@@ -70,7 +70,7 @@ class BudgetAlert(Base):
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
 
     # Relationships
-    budget: Mapped["Budget"] = relationship(back_populates="alerts")
+    budget: Mapped["Budget"] = relationship(back_populates="alerts", lazy="raise")
 
     def __repr__(self) -> str:
         return f"<BudgetAlert budget={self.budget_id} reached={self.percent_reached}%>"
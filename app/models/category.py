@@ -23,7 +23,9 @@ class Category(Base):
     )
 
     # Relationships
-    user: Mapped["User | None"] = relationship(back_populates="categories")  # noqa: F821
+    user: Mapped["User | None"] = relationship(  # noqa: F821
+        back_populates="categories", lazy="raise"
+    )
 
     def __repr__(self) -> str:
         return f"<Category key={self.key!r} label={self.label!r} user_id={self.user_id}>"
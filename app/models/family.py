@@ -31,9 +31,9 @@ class Family(Base):
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
 
     # Relationships
-    owner: Mapped["User"] = relationship()  # noqa: F821
+    owner: Mapped["User"] = relationship(lazy="raise")  # noqa: F821
     members: Mapped[list["FamilyMember"]] = relationship(
-        back_populates="family", lazy="selectin"
+        back_populates="family", lazy="raise", passive_deletes=True
     )
 
     def __repr__(self) -> str:
@@ -59,8 +59,8 @@ class FamilyMember(Base):
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
 
     # Relationships
-    family: Mapped["Family"] = relationship(back_populates="members")
-    user: Mapped["User"] = relationship()  # noqa: F821
+    family: Mapped["Family"] = relationship(back_populates="members", lazy="raise")
+    user: Mapped["User"] = relationship(lazy="raise")  # noqa: F821
 
     def __repr__(self) -> str:
         return f"<FamilyMember family={self.family_id} user={self.user_id} role={self.role}>"
@@ -81,7 +81,7 @@ class FamilyInvite(Base):
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
 
     # Relationships
-    family: Mapped["Family"] = relationship()
+    family: Mapped["Family"] = relationship(lazy="raise")
 
     def __repr__(self) -> str:
         return f"<FamilyInvite code={self.invite_code!r} family={self.family_id}>"
@@ -43,7 +43,7 @@ class Reminder(Base):
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
 
     # Relationships
-    user: Mapped["User"] = relationship(back_populates="reminders")  # noqa: F821
+    user: Mapped["User"] = relationship(back_populates="reminders", lazy="raise")  # noqa: F821
 
     def __repr__(self) -> str:
         return (
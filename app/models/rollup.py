@@ -0,0 +1,58 @@
+"""Monthly rollup model — per-user monthly sums, maintained incrementally."""
+
+from __future__ import annotations
+
+from decimal import Decimal
+
+from sqlalchemy import (
+    BigInteger,
+    ForeignKey,
+    Integer,
+    Numeric,
+    SmallInteger,
+    String,
+    UniqueConstraint,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class MonthlyRollup(Base):
+    """Sum and count of a user's transactions per (month, type, category).
+
+    Months are calendar months in the user's timezone; changing it rebuilds the
+    user's rows (UserService.update_timezone). `category_id` is a plain
+    denormalized key (no FK); deleting a category merges its rows into the
+    category_id IS NULL bucket, like its transactions (trigger from migration
+    004_rollup_category_delete).
+    """
+
+    __tablename__ = "monthly_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id",
+            "year",
+            "month",
+            "type",
+            "category_id",
+            name="uq_monthly_rollup_key",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    user_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    year: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    month: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    type: Mapped[str] = mapped_column(String(10), nullable=False)
+    category_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    total: Mapped[Decimal] = mapped_column(Numeric(18, 2), nullable=False, server_default="0")
+    count: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+
+    def __repr__(self) -> str:
+        return (
+            f"<MonthlyRollup user={self.user_id} {self.year}-{self.month:02d}"
+            f" {self.type} cat={self.category_id} total={self.total} n={self.count}>"
+        )
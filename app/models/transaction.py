@@ -15,6 +15,7 @@ from sqlalchemy import (
     Numeric,
     String,
     func,
+    text,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -27,6 +28,20 @@ class Transaction(Base):
         CheckConstraint("type IN ('expense', 'income')", name="ck_transaction_type"),
         Index("ix_transaction_user_created", "user_id", "created_at"),
         Index("ix_transaction_user_type_created", "user_id", "type", "created_at"),
+        Index(
+            "ix_transaction_family_created",
+            "family_id",
+            "created_at",
+            postgresql_where=text("family_id IS NOT NULL"),
+        ),
+        Index(
+            "ix_transaction_user_category_created",
+            "user_id",
+            "category_id",
+            "created_at",
+            postgresql_include=["amount_base"],
+            postgresql_where=text("type = 'expense'"),
+        ),
     )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
@@ -50,9 +65,11 @@ class Transaction(Base):
     )
 
     # Relationships
-    user: Mapped["User"] = relationship(back_populates="transactions")  # noqa: F821
-    category: Mapped["Category | None"] = relationship(lazy="joined")  # noqa: F821
-    family: Mapped["Family | None"] = relationship()  # noqa: F821
+    user: Mapped["User"] = relationship(  # noqa: F821
+        back_populates="transactions", lazy="raise"
+    )
+    category: Mapped["Category | None"] = relationship(lazy="raise")  # noqa: F821
+    family: Mapped["Family | None"] = relationship(lazy="raise")  # noqa: F821
 
     def __repr__(self) -> str:
         return (
@@ -29,13 +29,13 @@ class User(Base):
 
     # Relationships
     transactions: Mapped[list["Transaction"]] = relationship(  # noqa: F821
-        back_populates="user", lazy="selectin"
+        back_populates="user", lazy="raise", passive_deletes=True
     )
     categories: Mapped[list["Category"]] = relationship(  # noqa: F821
-        back_populates="user", lazy="selectin"
+        back_populates="user", lazy="raise", passive_deletes=True
     )
     reminders: Mapped[list["Reminder"]] = relationship(  # noqa: F821
-        back_populates="user", lazy="selectin"
+        back_populates="user", lazy="raise", passive_deletes=True
     )
 
     def __repr__(self) -> str:
@@ -6,6 +6,7 @@ from typing import Any, Generic, Sequence, TypeVar
 
 from sqlalchemy import delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.interfaces import ORMOption
 
 from app.db.base import Base
 
@@ -20,8 +21,9 @@ class BaseRepository(Generic[ModelT]):
     def __init__(self, session: AsyncSession) -> None:
         self._session = session
 
-    async def get_by_id(self, id_: int) -> ModelT | None:
-        return await self._session.get(self.model, id_)
+    async def get_by_id(self, id_: int, *options: ORMOption) -> ModelT | None:
+        """Fetch by primary key; pass loader options to pull in relationships."""
+        return await self._session.get(self.model, id_, options=options)
 
     async def get_all(self, limit: int = 100, offset: int = 0) -> Sequence[ModelT]:
         stmt = select(self.model).limit(limit).offset(offset)
@@ -29,10 +31,10 @@ class BaseRepository(Generic[ModelT]):
         return result.scalars().all()
 
     async def create(self, **kwargs: Any) -> ModelT:
+        """INSERT one row; server defaults are loaded by its RETURNING (eager_defaults)."""
         obj = self.model(**kwargs)
         self._session.add(obj)
         await self._session.flush()
-        await self._session.refresh(obj)
         return obj
 
     async def update_by_id(self, id_: int, **kwargs: Any) -> None:
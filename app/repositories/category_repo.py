@@ -28,6 +28,16 @@ class CategoryRepository(BaseRepository[Category]):
         result = await self._session.execute(stmt)
         return result.scalars().all()
 
+    async def get_custom(self, user_id: int) -> Sequence[Category]:
+        """Get only the categories a user created."""
+        stmt = (
+            select(Category)
+            .where(Category.user_id == user_id, Category.is_default.is_(False))
+            .order_by(Category.key)
+        )
+        result = await self._session.execute(stmt)
+        return result.scalars().all()
+
     async def get_by_key(self, key: str, user_id: int | None = None) -> Category | None:
         """Get category by key — checks user-specific first, then defaults."""
         if user_id:
@@ -0,0 +1,195 @@
+"""Monthly rollup repository — incremental sums behind the monthly report."""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Sequence
+
+from sqlalchemy import Integer, Row, and_, cast, delete, extract, func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models.rollup import MonthlyRollup
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.repositories.base import BaseRepository
+
+
+class RollupRepository(BaseRepository[MonthlyRollup]):
+    model = MonthlyRollup
+
+    async def apply_delta(
+        self,
+        user_id: int,
+        year: int,
+        month: int,
+        type_: str,
+        category_id: int | None,
+        amount: Decimal,
+        count: int = 1,
+    ) -> None:
+        """Add (or, with negative values, subtract) one change to a rollup row."""
+        stmt = insert(MonthlyRollup).values(
+            user_id=user_id,
+            year=year,
+            month=month,
+            type=type_,
+            category_id=category_id,
+            total=amount,
+            count=count,
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_monthly_rollup_key",
+            set_={
+                "total": MonthlyRollup.total + stmt.excluded.total,
+                "count": MonthlyRollup.count + stmt.excluded.count,
+            },
+        )
+        await self._session.execute(stmt)
+
+    async def apply_deltas(
+        self,
+        user_id: int,
+        deltas: dict[tuple[int, int, str, int | None], tuple[Decimal, int]],
+    ) -> None:
+        """Apply many changes in one statement.
+
+        `deltas` maps (year, month, type, category_id) → (amount, count); keys
+        must be unique, which a dict guarantees (ON CONFLICT can't hit a row twice).
+        """
+        if not deltas:
+            return
+        stmt = insert(MonthlyRollup).values(
+            [
+                {
+                    "user_id": user_id,
+                    "year": year,
+                    "month": month,
+                    "type": type_,
+                    "category_id": category_id,
+                    "total": total,
+                    "count": count,
+                }
+                for (year, month, type_, category_id), (total, count) in deltas.items()
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_monthly_rollup_key",
+            set_={
+                "total": MonthlyRollup.total + stmt.excluded.total,
+                "count": MonthlyRollup.count + stmt.excluded.count,
+            },
+        )
+        await self._session.execute(stmt)
+
+    async def get_monthly_totals(self, user_id: int, year: int, month: int) -> dict:
+        """Totals, counts and per-category expense sums for a month — O(categories)."""
+        stmt = select(
+            MonthlyRollup.type,
+            MonthlyRollup.category_id,
+            MonthlyRollup.total,
+            MonthlyRollup.count,
+        ).where(
+            MonthlyRollup.user_id == user_id,
+            MonthlyRollup.year == year,
+            MonthlyRollup.month == month,
+            MonthlyRollup.count > 0,
+        )
+
+        totals = {"expense": Decimal(0), "income": Decimal(0)}
+        counts = {"expense": 0, "income": 0}
+        by_category: dict[int | None, Decimal] = {}
+        for type_, category_id, total, count in await self._session.execute(stmt):
+            totals[type_] += total
+            counts[type_] += count
+            if type_ == "expense":
+                by_category[category_id] = total
+
+        return {
+            "total_expense": totals["expense"],
+            "total_income": totals["income"],
+            "balance": totals["income"] - totals["expense"],
+            "expense_count": counts["expense"],
+            "income_count": counts["income"],
+            "by_category": by_category,
+        }
+
+    async def rebuild(self, user_id: int | None = None) -> None:
+        """Recompute rollups from raw transactions (all users, or one)."""
+        clear = delete(MonthlyRollup)
+        if user_id is not None:
+            clear = clear.where(MonthlyRollup.user_id == user_id)
+        await self._session.execute(clear)
+
+        expected = _expected_rollups(user_id)
+        stmt = insert(MonthlyRollup).from_select(
+            ["user_id", "year", "month", "type", "category_id", "total", "count"],
+            select(expected),
+        )
+        await self._session.execute(stmt)
+
+    async def find_drift(self, user_id: int | None = None) -> Sequence[Row]:
+        """Rollup rows that disagree with the raw transactions.
+
+        Each row: user_id, year, month, type, category_id, expected_total,
+        actual_total, expected_count, actual_count (None where a side is missing).
+        """
+        expected = _expected_rollups(user_id)
+        r = MonthlyRollup
+        on = and_(
+            r.user_id == expected.c.user_id,
+            r.year == expected.c.year,
+            r.month == expected.c.month,
+            r.type == expected.c.type,
+            r.category_id.is_not_distinct_from(expected.c.category_id),
+        )
+        stmt = (
+            select(
+                func.coalesce(expected.c.user_id, r.user_id).label("user_id"),
+                func.coalesce(expected.c.year, r.year).label("year"),
+                func.coalesce(expected.c.month, r.month).label("month"),
+                func.coalesce(expected.c.type, r.type).label("type"),
+                func.coalesce(expected.c.category_id, r.category_id).label("category_id"),
+                expected.c.total.label("expected_total"),
+                r.total.label("actual_total"),
+                expected.c.count.label("expected_count"),
+                r.count.label("actual_count"),
+            )
+            .select_from(expected.join(r, on, full=True))
+            .where(
+                or_(
+                    expected.c.user_id.is_(None) & (r.count != 0),
+                    r.user_id.is_(None),
+                    expected.c.total != r.total,
+                    expected.c.count != r.count,
+                )
+            )
+        )
+        if user_id is not None:
+            stmt = stmt.where(func.coalesce(expected.c.user_id, r.user_id) == user_id)
+        result = await self._session.execute(stmt)
+        return result.all()
+
+
+def _expected_rollups(user_id: int | None = None):
+    """Subquery aggregating transactions the way rollups are keyed."""
+    local = func.timezone(User.timezone, Transaction.created_at)
+    year = cast(extract("year", local), Integer).label("year")
+    month = cast(extract("month", local), Integer).label("month")
+    stmt = (
+        select(
+            Transaction.user_id,
+            year,
+            month,
+            Transaction.type,
+            Transaction.category_id,
+            func.sum(func.coalesce(Transaction.amount_base, Transaction.amount)).label("total"),
+            func.count().label("count"),
+        )
+        .join(User, User.id == Transaction.user_id)
+        .group_by(
+            Transaction.user_id, year, month, Transaction.type, Transaction.category_id
+        )
+    )
+    if user_id is not None:
+        stmt = stmt.where(Transaction.user_id == user_id)
+    return stmt.subquery("expected")
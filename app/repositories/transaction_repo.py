@@ -4,12 +4,13 @@ from __future__ import annotations
 
 from datetime import datetime
 from decimal import Decimal
-from typing import Sequence
+from typing import Any, Sequence
 
-from sqlalchemy import extract, func, select
+from sqlalchemy import Row, func, insert, select
 
 from app.models.transaction import Transaction
 from app.repositories.base import BaseRepository
+from app.utils.dates import month_bounds
 
 
 class TransactionRepository(BaseRepository[Transaction]):
@@ -40,20 +41,35 @@ class TransactionRepository(BaseRepository[Transaction]):
             family_id=family_id,
         )
 
+    async def add_many(self, rows: Sequence[dict[str, Any]]) -> Sequence[Transaction]:
+        """Insert many transactions at once and return them.
+
+        Rows are Transaction column values (``type``, not ``type_``); a missing
+        amount_base defaults to amount. SQLAlchemy sends them as multi-row
+        ``INSERT ... VALUES (...), (...) RETURNING`` batches, not row by row.
+        """
+        if not rows:
+            return []
+        values = [{**row, "amount_base": row.get("amount_base") or row["amount"]} for row in rows]
+        result = await self._session.scalars(insert(Transaction).returning(Transaction), values)
+        return result.all()
+
     async def get_by_month(
         self,
         user_id: int,
         year: int,
         month: int,
         entry_type: str | None = None,
+        tz: str = "UTC",
     ) -> Sequence[Transaction]:
-        """Get all transactions for a user in a given month."""
+        """Get all transactions for a user in a given month (in timezone `tz`)."""
+        start, end = month_bounds(year, month, tz)
         stmt = (
             select(Transaction)
             .where(
                 Transaction.user_id == user_id,
-                extract("year", Transaction.created_at) == year,
-                extract("month", Transaction.created_at) == month,
+                Transaction.created_at >= start,
+                Transaction.created_at < end,
             )
             .order_by(Transaction.created_at.desc())
         )
@@ -67,48 +83,101 @@ class TransactionRepository(BaseRepository[Transaction]):
         user_id: int,
         year: int,
         month: int,
+        tz: str = "UTC",
+        top_n: int = 5,
     ) -> dict:
-        """Get aggregated monthly summary for a user."""
-        transactions = await self.get_by_month(user_id, year, month)
-
-        expenses = [t for t in transactions if t.type == "expense"]
-        incomes = [t for t in transactions if t.type == "income"]
-
-        total_expense = sum(t.amount_base or t.amount for t in expenses)
-        total_income = sum(t.amount_base or t.amount for t in incomes)
+        """Get aggregated monthly summary for a user.
+
+        Aggregation runs in Postgres: one GROUP BY (type, category_id) for sums
+        and counts, one ORDER BY amount LIMIT top_n for the largest expenses.
+        Cost in Python is O(categories), whatever the number of transactions.
+        """
+        start, end = month_bounds(year, month, tz)
+        in_month = (
+            Transaction.user_id == user_id,
+            Transaction.created_at >= start,
+            Transaction.created_at < end,
+        )
+        value = func.coalesce(Transaction.amount_base, Transaction.amount)
+
+        totals_stmt = (
+            select(
+                Transaction.type,
+                Transaction.category_id,
+                func.sum(value),
+                func.count(),
+            )
+            .where(*in_month)
+            .group_by(Transaction.type, Transaction.category_id)
+        )
 
+        totals = {"expense": Decimal(0), "income": Decimal(0)}
+        counts = {"expense": 0, "income": 0}
         by_category: dict[int | None, Decimal] = {}
-        for t in expenses:
-            by_category[t.category_id] = by_category.get(t.category_id, Decimal(0)) + (
-                t.amount_base or t.amount
-            )
+        for type_, category_id, total, count in await self._session.execute(totals_stmt):
+            totals[type_] += total
+            counts[type_] += count
+            if type_ == "expense":
+                by_category[category_id] = total
 
-        top_expenses = sorted(expenses, key=lambda x: x.amount, reverse=True)[:5]
+        top_expenses = await self.get_top_expenses(user_id, year, month, tz, top_n)
 
         return {
-            "total_expense": total_expense,
-            "total_income": total_income,
-            "balance": total_income - total_expense,
-            "expense_count": len(expenses),
-            "income_count": len(incomes),
+            "total_expense": totals["expense"],
+            "total_income": totals["income"],
+            "balance": totals["income"] - totals["expense"],
+            "expense_count": counts["expense"],
+            "income_count": counts["income"],
             "by_category": by_category,
             "top_expenses": top_expenses,
         }
 
+    async def get_top_expenses(
+        self,
+        user_id: int,
+        year: int,
+        month: int,
+        tz: str = "UTC",
+        limit: int = 5,
+    ) -> Sequence[Row]:
+        """Largest expenses of a month as light rows (no ORM objects)."""
+        start, end = month_bounds(year, month, tz)
+        stmt = (
+            select(
+                Transaction.id,
+                Transaction.amount,
+                Transaction.currency,
+                Transaction.description,
+                Transaction.category_id,
+            )
+            .where(
+                Transaction.user_id == user_id,
+                Transaction.type == "expense",
+                Transaction.created_at >= start,
+                Transaction.created_at < end,
+            )
+            .order_by(Transaction.amount.desc())
+            .limit(limit)
+        )
+        result = await self._session.execute(stmt)
+        return result.all()
+
     async def get_by_family_month(
         self,
         family_id: int,
         year: int,
         month: int,
         entry_type: str | None = None,
+        tz: str = "UTC",
     ) -> Sequence[Transaction]:
-        """Get all transactions for a family in a given month."""
+        """Get all transactions for a family in a given month (in timezone `tz`)."""
+        start, end = month_bounds(year, month, tz)
         stmt = (
             select(Transaction)
             .where(
                 Transaction.family_id == family_id,
-                extract("year", Transaction.created_at) == year,
-                extract("month", Transaction.created_at) == month,
+                Transaction.created_at >= start,
+                Transaction.created_at < end,
             )
             .order_by(Transaction.created_at.desc())
         )
@@ -123,14 +192,16 @@ class TransactionRepository(BaseRepository[Transaction]):
         category_id: int,
         year: int,
         month: int,
+        tz: str = "UTC",
     ) -> Decimal:
-        """Get total spending for a specific category in a month."""
+        """Get total spending for a specific category in a month (in timezone `tz`)."""
+        start, end = month_bounds(year, month, tz)
         stmt = select(func.coalesce(func.sum(Transaction.amount_base), 0)).where(
             Transaction.user_id == user_id,
             Transaction.category_id == category_id,
             Transaction.type == "expense",
-            extract("year", Transaction.created_at) == year,
-            extract("month", Transaction.created_at) == month,
+            Transaction.created_at >= start,
+            Transaction.created_at < end,
         )
         result = await self._session.execute(stmt)
         return result.scalar_one()
@@ -145,3 +216,20 @@ class TransactionRepository(BaseRepository[Transaction]):
         )
         result = await self._session.execute(stmt)
         return result.rowcount > 0
+
+    async def delete_returning(self, transaction_id: int, user_id: int) -> Row | None:
+        """Delete a transaction owned by user; return what rollups need to know."""
+        from sqlalchemy import delete
+
+        stmt = (
+            delete(Transaction)
+            .where(Transaction.id == transaction_id, Transaction.user_id == user_id)
+            .returning(
+                Transaction.type,
+                Transaction.category_id,
+                func.coalesce(Transaction.amount_base, Transaction.amount).label("value"),
+                Transaction.created_at,
+            )
+        )
+        result = await self._session.execute(stmt)
+        return result.one_or_none()
@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
-from sqlalchemy import select
+from typing import Any
+
+from sqlalchemy import select, update
 
 from app.models.user import User
 from app.repositories.base import BaseRepository
@@ -50,7 +52,7 @@ class UserRepository(BaseRepository[User]):
         language: str | None = None,
         default_currency: str | None = None,
         timezone: str | None = None,
-    ) -> None:
+    ) -> User | None:
         kwargs = {}
         if language is not None:
             kwargs["language"] = language
@@ -59,4 +61,11 @@ class UserRepository(BaseRepository[User]):
         if timezone is not None:
             kwargs["timezone"] = timezone
         if kwargs:
-            await self.update_by_id(user_id, **kwargs)
+            return await self.update_returning(user_id, **kwargs)
+        return await self.get_by_id(user_id)
+
+    async def update_returning(self, user_id: int, **kwargs: Any) -> User | None:
+        """UPDATE ... RETURNING — the fresh row comes back in the same round trip."""
+        stmt = update(User).where(User.id == user_id).values(**kwargs).returning(User)
+        result = await self._session.execute(stmt)
+        return result.scalar_one_or_none()
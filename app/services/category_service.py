@@ -6,23 +6,57 @@ from typing import Sequence
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache.category_catalogue import CategoryCatalogue, CategorySnapshot
+from app.cache.report_cache import ReportCache
 from app.models.category import Category
 from app.repositories.category_repo import CategoryRepository
 from app.utils.icons import pick_icon
 
 
 class CategoryService:
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        report_cache: ReportCache | None = None,
+        catalogue: CategoryCatalogue | None = None,
+    ) -> None:
         self._repo = CategoryRepository(session)
         self._session = session
+        self._report_cache = report_cache
+        self._catalogue = catalogue
+
+    async def get_for_user(self, user_id: int) -> Sequence[CategorySnapshot]:
+        """Get all categories available to a user (defaults + custom).
+
+        With a catalogue, defaults come from process memory and custom
+        categories from Redis — the DB is only hit on a custom-cache miss.
+        """
+        if self._catalogue is None:
+            rows = await self._repo.get_for_user(user_id)
+            return tuple(CategorySnapshot.from_model(c) for c in rows)
+
+        if not self._catalogue.defaults:
+            await self.reload_catalogue()
 
-    async def get_for_user(self, user_id: int) -> Sequence[Category]:
-        """Get all categories available to a user (defaults + custom)."""
-        return await self._repo.get_for_user(user_id)
+        custom = await self._catalogue.get_custom(user_id)
+        if custom is None:
+            rows = await self._repo.get_custom(user_id)
+            custom = tuple(CategorySnapshot.from_model(c) for c in rows)
+            await self._catalogue.set_custom(user_id, custom)
+        return self._catalogue.defaults + custom
 
-    async def get_by_id(self, category_id: int) -> Category | None:
+    async def get_by_id(self, category_id: int) -> Category | CategorySnapshot | None:
+        if self._catalogue is not None:
+            default = self._catalogue.get_default(category_id)
+            if default is not None:
+                return default
         return await self._repo.get_by_id(category_id)
 
+    async def reload_catalogue(self) -> None:
+        """Load default categories from the DB into the catalogue."""
+        if self._catalogue is not None:
+            self._catalogue.replace_defaults(await self._repo.get_defaults())
+
     async def get_by_key(self, key: str, user_id: int | None = None) -> Category | None:
         return await self._repo.get_by_key(key, user_id)
 
@@ -51,6 +85,10 @@ class CategoryService:
             icon=icon,
         )
         await self._session.commit()
+        if self._catalogue is not None:
+            await self._catalogue.invalidate_custom(user_id)
+        if self._report_cache is not None:
+            await self._report_cache.invalidate(user_id)
         return category
 
     async def get_defaults(self) -> Sequence[Category]:
@@ -1,39 +1,233 @@
-"""OCR service — extract financial data from screenshots."""
+"""OCR service — extract financial data from screenshots.
+
+Tesseract is CPU-bound and pytesseract blocks while its subprocess runs, so OCR
+jobs go to a process pool. The pool takes at most `max_pending` jobs
+(running + queued); beyond that `OCRBusyError` is raised right away, and the
+caller asks the user for a caption instead of queueing more work. A job's slot
+is reserved before its photo is downloaded, so a rejected photo costs nothing.
+"""
 
 from __future__ import annotations
 
+import asyncio
+import multiprocessing
 import os
-import tempfile
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Any, Callable, TypeVar
 
+import structlog
 from aiogram import Bot
+from aiogram.types import PhotoSize
+
+from app.cache.ocr_cache import OCRCache
+from app.utils.ocr import OCRResult, difference_hash, extract_amount_from_image
+
+log = structlog.get_logger()
+
+T = TypeVar("T")
+
+
+class OCRBusyError(Exception):
+    """The OCR pool is saturated — the job was not accepted."""
+
+
+class OCRPool:
+    """Bounded process pool for OCR jobs.
+
+    A job keeps its slot until its worker process actually finishes, even if
+    the caller stopped waiting after `timeout`, so a run of slow screenshots
+    cannot pile up more work than `max_pending`. Abandoning a job does not stop
+    it — the worker stays busy until the job returns — so jobs should bound
+    themselves; OCRService passes `timeout` on to Tesseract, which is killed
+    once it runs that long.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 8, timeout: float = 15.0) -> None:
+        self._workers = workers
+        self._executor = self._new_executor()
+        self._max_pending = max_pending
+        self._timeout = timeout
+        self._pending = 0
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self._workers,
+            # spawn: forking a process with a running event loop and threads is unsafe
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    async def warm_up(self) -> None:
+        """Start the worker processes now rather than on the first screenshot."""
+        await asyncio.gather(
+            *(asyncio.wrap_future(self._executor.submit(os.getpid)) for _ in range(self._workers))
+        )
+
+    @property
+    def depth(self) -> int:
+        """Jobs running or waiting for a worker."""
+        return self._pending
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    @property
+    def timeout(self) -> float:
+        return self._timeout
+
+    @property
+    def saturated(self) -> bool:
+        return self._pending >= self._max_pending
+
+    @contextmanager
+    def reserve(self) -> Iterator[OCRSlot]:
+        """Take a job slot before the job's input is ready.
+
+        The slot is given back on leaving the block unless it was used to run
+        a job; then it is held until the job's worker finishes.
+
+        Raises:
+            OCRBusyError: `max_pending` jobs are already in flight.
+        """
+        if self.saturated:
+            log.warning("ocr_rejected", queue_depth=self._pending)
+            raise OCRBusyError
+        self._pending += 1
+        slot = OCRSlot(self)
+        try:
+            yield slot
+        finally:
+            if not slot.used:
+                self._release()
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T | None:
+        """Run `fn(*args)` in a worker; None if it takes longer than `timeout`.
+
+        Raises:
+            OCRBusyError: `max_pending` jobs are already in flight.
+        """
+        with self.reserve() as slot:
+            return await slot.run(fn, *args)
+
+    async def _submit(self, slot: OCRSlot, fn: Callable[..., T], *args: Any) -> T | None:
+        """Run a job on a reserved slot; the slot is freed when the job finishes."""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        executor = self._executor
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._replace_broken(executor)
+            raise
+        slot.used = True
+        future.add_done_callback(
+            lambda _f: loop.is_closed() or loop.call_soon_threadsafe(self._release)
+        )
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self._timeout)
+        except TimeoutError:
+            log.warning("ocr_timeout", timeout=self._timeout, queue_depth=self._pending)
+            return None
+        except BrokenProcessPool:
+            self._replace_broken(executor)
+            return None
+        finally:
+            log.info(
+                "ocr_job",
+                duration_ms=round((time.perf_counter() - started) * 1000),
+                queue_depth=self._pending,
+            )
+
+    def _replace_broken(self, broken: ProcessPoolExecutor) -> None:
+        """A worker died (e.g. OOM-killed) — start a fresh pool for later jobs.
+
+        Every job of the broken pool fails at once; only the first replaces it.
+        """
+        if self._executor is not broken:
+            return
+        log.error("ocr_pool_broken")
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._new_executor()
+
+    def _release(self) -> None:
+        self._pending -= 1
 
-from app.utils.ocr import OCRResult, extract_amount_from_image
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class OCRSlot:
+    """A reserved place in an OCRPool, good for one job."""
+
+    def __init__(self, pool: OCRPool) -> None:
+        self._pool = pool
+        self.used = False
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T | None:
+        if self.used:
+            raise RuntimeError("OCR slot already used")
+        return await self._pool._submit(self, fn, *args)
 
 
 class OCRService:
     """Service for processing bank app screenshots."""
 
-    @staticmethod
-    async def process_photo(bot: Bot, photo_file_id: str) -> OCRResult | None:
-        """Download photo from Telegram and run OCR.
+    def __init__(
+        self, pool: OCRPool, cache: OCRCache | None = None, crop: bool = False
+    ) -> None:
+        self._pool = pool
+        self._cache = cache
+        self._crop = crop
+
+    @property
+    def parallel_jobs(self) -> int:
+        """Photos worth recognizing at once; more would only wait for a worker."""
+        return self._pool.workers
+
+    async def process_photo(self, bot: Bot, photo: PhotoSize, user_id: int) -> OCRResult | None:
+        """Download photo from Telegram and run OCR in the pool.
+
+        With a cache, a photo seen before (same Telegram file) is answered
+        from Redis without OCR. Any other photo is recognized; if this user
+        recently sent the same amount on a near-identical image the result is
+        only flagged. Both have `duplicate=True`.
 
         Args:
             bot: The aiogram Bot instance.
-            photo_file_id: Telegram file_id of the photo.
+            photo: The photo size to recognize.
+            user_id: Internal user id (scopes the duplicate check).
 
         Returns:
-            OCRResult or None if recognition failed.
+            OCRResult or None if recognition failed or timed out.
+
+        Raises:
+            OCRBusyError: The OCR pool is saturated; nothing was downloaded.
         """
-        with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp:
-            tmp_path = tmp.name
+        if self._cache is not None:
+            cached = await self._cache.get_by_file(photo.file_unique_id)
+            if cached is not None:
+                return cached
 
-        try:
-            await bot.download(photo_file_id, destination=tmp_path)
-            return extract_amount_from_image(tmp_path)
-        except Exception:
-            return None
-        finally:
+        with self._pool.reserve() as slot:
             try:
-                os.unlink(tmp_path)
-            except OSError:
-                pass
+                # Downloaded into memory; the bytes go to the worker over the pool's pipe
+                buffer = await bot.download(photo.file_id)
+                image = buffer.getvalue()
+
+                result = await slot.run(
+                    extract_amount_from_image, image, self._crop, self._pool.timeout
+                )
+                if result is not None and self._cache is not None:
+                    image_hash = await asyncio.to_thread(difference_hash, image)
+                    result.duplicate = await self._cache.is_duplicate(
+                        user_id, image_hash, result
+                    )
+                    await self._cache.set(photo.file_unique_id, user_id, image_hash, result)
+                return result
+            except Exception:
+                return None
@@ -6,16 +6,25 @@ from decimal import Decimal
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.category import Category
-from app.repositories.category_repo import CategoryRepository
+from app.cache.category_catalogue import CategoryCatalogue, CategorySnapshot
+from app.cache.report_cache import ReportCache
+from app.repositories.rollup_repo import RollupRepository
 from app.repositories.transaction_repo import TransactionRepository
+from app.services.category_service import CategoryService
 from app.utils.formatting import format_amount, get_month_name
 
 
 class ReportService:
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        cache: ReportCache | None = None,
+        catalogue: CategoryCatalogue | None = None,
+    ) -> None:
         self._tx_repo = TransactionRepository(session)
-        self._cat_repo = CategoryRepository(session)
+        self._rollup_repo = RollupRepository(session)
+        self._categories = CategoryService(session, catalogue=catalogue)
+        self._cache = cache
 
     async def build_monthly_text_report(
         self,
@@ -24,14 +33,45 @@ class ReportService:
         month: int,
         currency: str = "UZS",
         lang: str = "ru",
+        tz: str = "UTC",
     ) -> str:
-        """Build a formatted text report for a given month.
+        """Build a formatted text report for a given month (in the user's timezone).
+
+        Served from ReportCache when nothing changed since the last render.
+        Otherwise totals come from monthly_rollups (O(categories) rows) and only
+        the top-5 list touches raw transactions.
 
         Returns HTML-formatted string ready to send via Telegram.
         """
-        summary = await self._tx_repo.get_monthly_summary(user_id, year, month)
-        categories = await self._cat_repo.get_for_user(user_id)
-        cat_map: dict[int, Category] = {c.id: c for c in categories}
+        if self._cache is None:
+            return await self._render_monthly_text_report(
+                user_id, year, month, currency, lang, tz
+            )
+
+        field = ReportCache.field(year, month, currency, lang)
+        cached, version = await self._cache.get(user_id, field)
+        if cached is not None:
+            return cached
+
+        text = await self._render_monthly_text_report(user_id, year, month, currency, lang, tz)
+        await self._cache.set(user_id, field, text, version)
+        return text
+
+    async def _render_monthly_text_report(
+        self,
+        user_id: int,
+        year: int,
+        month: int,
+        currency: str,
+        lang: str,
+        tz: str,
+    ) -> str:
+        summary = await self._rollup_repo.get_monthly_totals(user_id, year, month)
+        summary["top_expenses"] = await self._tx_repo.get_top_expenses(
+            user_id, year, month, tz
+        )
+        categories = await self._categories.get_for_user(user_id)
+        cat_map: dict[int, CategorySnapshot] = {c.id: c for c in categories}
 
         month_name = get_month_name(month, lang)
 
@@ -2,18 +2,24 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterable
 from decimal import Decimal
+from zoneinfo import ZoneInfo
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache.report_cache import ReportCache
 from app.models.transaction import Transaction
+from app.repositories.rollup_repo import RollupRepository
 from app.repositories.transaction_repo import TransactionRepository
 
 
 class TransactionService:
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(self, session: AsyncSession, report_cache: ReportCache | None = None) -> None:
         self._repo = TransactionRepository(session)
+        self._rollups = RollupRepository(session)
         self._session = session
+        self._report_cache = report_cache
 
     async def add_transaction(
         self,
@@ -26,8 +32,12 @@ class TransactionService:
         description: str = "",
         source: str = "text",
         family_id: int | None = None,
+        tz: str = "UTC",
     ) -> Transaction:
-        """Create a new transaction (expense or income)."""
+        """Create a new transaction (expense or income) and bump its monthly rollup.
+
+        Both writes share one DB transaction; `tz` decides which month it lands in.
+        """
         transaction = await self._repo.add(
             user_id=user_id,
             type_=type_,
@@ -39,17 +49,61 @@ class TransactionService:
             source=source,
             family_id=family_id,
         )
+        local = transaction.created_at.astimezone(ZoneInfo(tz))
+        await self._rollups.apply_delta(
+            user_id=user_id,
+            year=local.year,
+            month=local.month,
+            type_=type_,
+            category_id=category_id,
+            amount=transaction.amount_base,
+        )
         await self._session.commit()
+        await self._invalidate_reports(user_id)
         return transaction
 
+    async def add_transactions(
+        self,
+        user_id: int,
+        type_: str,
+        items: list[dict],
+        category_id: int | None = None,
+        source: str = "photo",
+        tz: str = "UTC",
+    ) -> list[Transaction]:
+        """Create several transactions of one category (e.g. an album) in one commit.
+
+        Each item has "amount", "description" and "currency". All rows go in
+        one multi-row INSERT and all rollup changes in one upsert.
+        """
+        transactions = await self._repo.add_many(
+            [
+                {
+                    "user_id": user_id,
+                    "type": type_,
+                    "amount": Decimal(item["amount"]),
+                    "currency": item["currency"],
+                    "category_id": category_id,
+                    "description": item["description"],
+                    "source": source,
+                }
+                for item in items
+            ]
+        )
+        await self._rollups.apply_deltas(user_id, rollup_deltas(transactions, tz))
+        await self._session.commit()
+        await self._invalidate_reports(user_id)
+        return list(transactions)
+
     async def get_monthly_summary(
         self,
         user_id: int,
         year: int,
         month: int,
+        tz: str = "UTC",
     ) -> dict:
         """Get aggregated monthly financial summary."""
-        return await self._repo.get_monthly_summary(user_id, year, month)
+        return await self._repo.get_monthly_summary(user_id, year, month, tz)
 
     async def get_by_month(
         self,
@@ -57,14 +111,30 @@ class TransactionService:
         year: int,
         month: int,
         entry_type: str | None = None,
+        tz: str = "UTC",
     ):
-        return await self._repo.get_by_month(user_id, year, month, entry_type)
+        return await self._repo.get_by_month(user_id, year, month, entry_type, tz)
 
-    async def delete_transaction(self, transaction_id: int, user_id: int) -> bool:
-        """Delete a transaction (only if owned by user)."""
-        result = await self._repo.delete_transaction(transaction_id, user_id)
+    async def delete_transaction(
+        self, transaction_id: int, user_id: int, tz: str = "UTC"
+    ) -> bool:
+        """Delete a transaction (only if owned by user) and take it out of its rollup."""
+        deleted = await self._repo.delete_returning(transaction_id, user_id)
+        if deleted is not None:
+            local = deleted.created_at.astimezone(ZoneInfo(tz))
+            await self._rollups.apply_delta(
+                user_id=user_id,
+                year=local.year,
+                month=local.month,
+                type_=deleted.type,
+                category_id=deleted.category_id,
+                amount=-deleted.value,
+                count=-1,
+            )
         await self._session.commit()
-        return result
+        if deleted is not None:
+            await self._invalidate_reports(user_id)
+        return deleted is not None
 
     async def get_category_total(
         self,
@@ -72,6 +142,25 @@ class TransactionService:
         category_id: int,
         year: int,
         month: int,
+        tz: str = "UTC",
     ) -> Decimal:
         """Get total spending for a category in a given month."""
-        return await self._repo.get_category_total(user_id, category_id, year, month)
+        return await self._repo.get_category_total(user_id, category_id, year, month, tz)
+
+    async def _invalidate_reports(self, user_id: int) -> None:
+        if self._report_cache is not None:
+            await self._report_cache.invalidate(user_id)
+
+
+def rollup_deltas(
+    transactions: Iterable[Transaction], tz: str = "UTC"
+) -> dict[tuple[int, int, str, int | None], tuple[Decimal, int]]:
+    """Sum transactions into RollupRepository.apply_deltas keys (one user's rows)."""
+    zone = ZoneInfo(tz)
+    deltas: dict[tuple[int, int, str, int | None], tuple[Decimal, int]] = {}
+    for t in transactions:
+        local = t.created_at.astimezone(zone)
+        key = (local.year, local.month, t.type, t.category_id)
+        total, count = deltas.get(key, (Decimal(0), 0))
+        deltas[key] = (total + t.amount_base, count + 1)
+    return deltas
@@ -4,14 +4,24 @@ from __future__ import annotations
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache.report_cache import ReportCache
+from app.cache.user_cache import UserCache, UserSnapshot
 from app.models.user import User
+from app.repositories.rollup_repo import RollupRepository
 from app.repositories.user_repo import UserRepository
 
 
 class UserService:
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        cache: UserCache | None = None,
+        report_cache: ReportCache | None = None,
+    ) -> None:
         self._repo = UserRepository(session)
         self._session = session
+        self._cache = cache
+        self._report_cache = report_cache
 
     async def get_or_create(
         self,
@@ -19,31 +29,73 @@ class UserService:
         username: str | None = None,
         first_name: str | None = None,
     ) -> User:
-        """Get existing user or auto-register a new one."""
-        user = await self._repo.upsert(
+        """Get existing user or auto-register a new one.
+
+        Only flushes — the request's unit of work commits at the end of the update.
+        """
+        return await self._repo.upsert(
             telegram_id=telegram_id,
             username=username,
             first_name=first_name,
         )
-        await self._session.commit()
-        return user
+
+    async def resolve(
+        self,
+        telegram_id: int,
+        username: str | None = None,
+        first_name: str | None = None,
+    ) -> UserSnapshot:
+        """Resolve the user for an update — cache first, Postgres only on a miss.
+
+        On a miss (or changed Telegram names) the upsert is committed right away so
+        the cached id always points at a durable row.
+        """
+        if self._cache is not None:
+            snapshot = await self._cache.get(telegram_id)
+            if snapshot is not None and not snapshot.is_stale(username, first_name):
+                return snapshot
+
+        user = await self.get_or_create(telegram_id, username, first_name)
+        snapshot = UserSnapshot.from_model(user)
+        if self._cache is not None:
+            await self._session.commit()
+            await self._cache.set(snapshot)
+        return snapshot
 
     async def get_by_telegram_id(self, telegram_id: int) -> User | None:
         return await self._repo.get_by_telegram_id(telegram_id)
 
     async def update_language(self, user_id: int, language: str) -> None:
-        await self._repo.update_settings(user_id, language=language)
-        await self._session.commit()
+        user = await self._repo.update_settings(user_id, language=language)
+        await self._commit_and_cache(user)
 
     async def update_currency(self, user_id: int, currency: str) -> None:
-        await self._repo.update_settings(user_id, default_currency=currency)
-        await self._session.commit()
+        user = await self._repo.update_settings(user_id, default_currency=currency)
+        await self._commit_and_cache(user)
 
     async def update_timezone(self, user_id: int, timezone: str) -> None:
-        await self._repo.update_settings(user_id, timezone=timezone)
-        await self._session.commit()
+        """Change the timezone and re-key the user's monthly rollups to it.
+
+        Rollup months are local months, and deletes take a transaction out of
+        the month it falls in under the current timezone — so the rollups are
+        rebuilt in the same DB transaction as the change.
+        """
+        user = await self._repo.update_settings(user_id, timezone=timezone)
+        if user is not None:
+            await RollupRepository(self._session).rebuild(user_id)
+        await self._commit_and_cache(user)
 
     async def complete_registration(self, user_id: int, phone: str) -> None:
         """Save phone number and mark user as registered."""
-        await self._repo.update_by_id(user_id, phone=phone, is_registered=True)
+        user = await self._repo.update_returning(user_id, phone=phone, is_registered=True)
+        await self._commit_and_cache(user)
+
+    async def _commit_and_cache(self, user: User | None) -> None:
+        """Commit, write the fresh row through to the user cache, drop stale reports."""
         await self._session.commit()
+        if user is None:
+            return
+        if self._cache is not None:
+            await self._cache.set(UserSnapshot.from_model(user))
+        if self._report_cache is not None:
+            await self._report_cache.invalidate(user.id)
@@ -0,0 +1,17 @@
+"""Update delivery — worker pool, ack-fast webhook, poller and Redis streams."""
+
+from app.updates.polling import UpdatePoller
+from app.updates.pool import UpdateWorkerPool, update_key, update_sender
+from app.updates.stream import StreamConsumer, UpdateStream
+from app.updates.webhook import QueuedRequestHandler, UpdateSink
+
+__all__ = [
+    "QueuedRequestHandler",
+    "StreamConsumer",
+    "UpdatePoller",
+    "UpdateSink",
+    "UpdateStream",
+    "UpdateWorkerPool",
+    "update_key",
+    "update_sender",
+]
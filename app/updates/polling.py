@@ -0,0 +1,69 @@
+"""Long-polling ingress — fetch updates with getUpdates and hand them to a sink.
+
+Used instead of ``Dispatcher.start_polling`` when the update is not handled
+inline: the sink is an UpdateWorkerPool or, in multi-instance ingress mode,
+the Redis UpdateStream. The offset only moves past updates the sink accepted,
+so an update is never confirmed to Telegram before it is safely queued.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import structlog
+from aiogram import Bot
+
+from app.updates.webhook import UpdateSink
+
+log = structlog.get_logger()
+
+
+class UpdatePoller:
+    """getUpdates loop feeding an UpdateSink. Runs until cancelled."""
+
+    def __init__(
+        self,
+        bot: Bot,
+        sink: UpdateSink,
+        allowed_updates: list[str] | None = None,
+        timeout: int = 30,
+    ) -> None:
+        self._bot = bot
+        self._sink = sink
+        self._allowed_updates = allowed_updates
+        self._timeout = timeout
+
+    async def run(self) -> None:
+        offset: int | None = None
+        backoff = 1.0
+        while True:
+            try:
+                updates = await self._bot.get_updates(
+                    offset=offset,
+                    timeout=self._timeout,
+                    allowed_updates=self._allowed_updates,
+                    request_timeout=self._timeout + 10,
+                )
+            except Exception as e:
+                log.warning("polling_failed", error=str(e), retry_in=backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+                continue
+            backoff = 1.0
+
+            for update in updates:
+                await self._put(update.model_dump(mode="json", by_alias=True, exclude_none=True))
+                offset = update.update_id + 1
+
+    async def _put(self, update: dict[str, Any]) -> None:
+        """Retry until the sink takes the update — full queue or Redis down."""
+        delay = 0.1
+        while True:
+            try:
+                if await self._sink.put(update):
+                    return
+            except Exception:
+                log.exception("update_put_failed", update_id=update["update_id"])
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 10.0)
@@ -0,0 +1,295 @@
+"""Update worker pool — handle updates concurrently, but one at a time per user.
+
+Raw updates go into per-user mailboxes. A user with pending updates is put on
+a ready queue; a free worker takes the user, handles their oldest update and,
+if more arrived meanwhile, puts the user back at the end of the queue. So a
+user's updates run strictly in order, a slow OCR for one user never delays
+another, and no single user can hold more than one worker.
+
+There is a ready queue per lane. Workers always take FAST work (callbacks,
+text) first, and at most `slow_workers` of them run SLOW work (photos,
+reports) at once, so a burst of screenshots leaves workers free for taps. A
+user waits in the lane of their oldest pending update.
+
+Metrics are structlog events: ``update_handled`` (debug, per update, with the
+time it spent queued) and ``update_queue_stats`` every `stats_interval`
+seconds, including ``saturation`` — the share of the interval during which
+every worker was busy.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any
+
+import structlog
+from aiogram import Bot, Dispatcher
+
+from app.keyboards.main_menu import BTN_REPORT
+
+log = structlog.get_logger()
+
+UpdateKey = int | str
+
+
+class Lane(IntEnum):
+    FAST = 0
+    SLOW = 1
+
+
+@dataclass(slots=True)
+class _Queued:
+    update: dict[str, Any]
+    enqueued: float  # time.monotonic()
+    lane: Lane
+    on_done: Callable[[], Awaitable[None]] | None = None
+
+
+def _event(update: dict[str, Any]) -> dict[str, Any]:
+    """The payload of a raw update (its message, callback_query, ...)."""
+    for field, event in update.items():
+        if field != "update_id" and isinstance(event, dict):
+            return event
+    return {}
+
+
+def update_sender(update: dict[str, Any]) -> int | None:
+    """Id of the user (or, failing that, the chat) a raw update came from."""
+    event = _event(update)
+    sender = event.get("from") or event.get("user") or event.get("chat")
+    return sender.get("id") if sender else None
+
+
+def update_key(update: dict[str, Any]) -> UpdateKey:
+    """Ordering key of a raw update: its sender.
+
+    Album photos get a key of their own — AlbumMiddleware has to see them
+    concurrently to collect them into one handler call.
+    """
+    sender = update_sender(update)
+    if sender is None or _event(update).get("media_group_id"):
+        return f"update:{update.get('update_id')}"
+    return sender
+
+
+def update_lane(update: dict[str, Any]) -> Lane:
+    """SLOW for screenshots, documents and reports; FAST for the rest."""
+    if "callback_query" in update:
+        data = update["callback_query"].get("data") or ""
+        return Lane.SLOW if data.startswith("report:") else Lane.FAST
+    event = _event(update)
+    if "photo" in event or "document" in event:
+        return Lane.SLOW
+    text = event.get("text") or ""
+    if text.startswith("/report") or text == BTN_REPORT:
+        return Lane.SLOW
+    return Lane.FAST
+
+
+class UpdateWorkerPool:
+    """Feed raw updates to the dispatcher from `workers` tasks.
+
+    `submit` never waits: past `max_queued` updates not yet started it returns
+    False, and the caller decides how to push back.
+    """
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        workers: int = 16,
+        slow_workers: int | None = None,
+        max_queued: int = 1000,
+        stats_interval: float = 30.0,
+    ) -> None:
+        self._dispatcher = dispatcher
+        self._bot = bot
+        self._workers = workers
+        self._slow_workers = slow_workers or max(1, workers // 2)
+        self._max_queued = max_queued
+        self._stats_interval = stats_interval
+
+        # A user's mailbox stays here, possibly empty, while a worker handles
+        # one of their updates — that is what keeps the user off the ready queues
+        self._mailboxes: dict[UpdateKey, deque[_Queued]] = {}
+        self._ready: dict[Lane, deque[UpdateKey]] = {lane: deque() for lane in Lane}
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._tasks: list[asyncio.Task[None]] = []
+        self._queued = 0
+        self._busy = 0
+        self._busy_slow = 0
+
+        # Reset by every stats report
+        self._lags_ms: dict[Lane, list[float]] = {lane: [] for lane in Lane}
+        self._handled = 0
+        self._rejected = 0
+        self._saturated_for = 0.0
+        self._saturated_since: float | None = None
+
+    @property
+    def depth(self) -> int:
+        """Updates accepted but not started yet."""
+        return self._queued
+
+    @property
+    def busy(self) -> int:
+        """Workers handling an update right now."""
+        return self._busy
+
+    @property
+    def full(self) -> bool:
+        return self._queued >= self._max_queued
+
+    def submit(
+        self,
+        update: dict[str, Any],
+        on_done: Callable[[], Awaitable[None]] | None = None,
+    ) -> bool:
+        """Queue a raw update; False if the queue is full.
+
+        `on_done` is awaited once the update has been handled, whether or not
+        a handler raised.
+        """
+        if self.full:
+            self._rejected += 1
+            log.warning("update_queue_full", queue_depth=self._queued)
+            return False
+
+        key = update_key(update)
+        item = _Queued(update, time.monotonic(), update_lane(update), on_done)
+        mailbox = self._mailboxes.get(key)
+        if mailbox is None:
+            self._mailboxes[key] = deque([item])
+            self._make_ready(key, item.lane)
+        else:
+            mailbox.append(item)
+        self._queued += 1
+        self._idle.clear()
+        return True
+
+    async def put(self, update: dict[str, Any]) -> bool:
+        """`submit` as an UpdateSink (see app.updates.webhook)."""
+        return self.submit(update)
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self._workers)]
+        self._tasks.append(asyncio.create_task(self._report()))
+        log.info(
+            "update_pool_started",
+            workers=self._workers,
+            slow_workers=self._slow_workers,
+            max_queued=self._max_queued,
+        )
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Finish the queued updates (up to `timeout` seconds), then stop workers."""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except TimeoutError:
+            log.warning("update_pool_drain_timeout", dropped=self._queued, busy=self._busy)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _make_ready(self, key: UpdateKey, lane: Lane) -> None:
+        self._ready[lane].append(key)
+        self._wakeup.set()
+
+    async def _next_key(self) -> tuple[UpdateKey, Lane]:
+        while True:
+            if self._ready[Lane.FAST]:
+                return self._ready[Lane.FAST].popleft(), Lane.FAST
+            if self._ready[Lane.SLOW] and self._busy_slow < self._slow_workers:
+                return self._ready[Lane.SLOW].popleft(), Lane.SLOW
+            self._wakeup.clear()
+            await self._wakeup.wait()
+
+    async def _work(self) -> None:
+        while True:
+            key, lane = await self._next_key()
+            mailbox = self._mailboxes[key]
+            item = mailbox.popleft()
+            self._queued -= 1
+            self._set_busy(self._busy + 1)
+            self._busy_slow += lane is Lane.SLOW
+            lag_ms = (time.monotonic() - item.enqueued) * 1000
+            self._lags_ms[lane].append(lag_ms)
+            started = time.perf_counter()
+            try:
+                await self._handle(item)
+            finally:
+                self._set_busy(self._busy - 1)
+                self._handled += 1
+                if lane is Lane.SLOW:
+                    self._busy_slow -= 1
+                    self._wakeup.set()  # a SLOW slot is free again
+                if mailbox:
+                    self._make_ready(key, mailbox[0].lane)
+                else:
+                    del self._mailboxes[key]
+                if not self._mailboxes:
+                    self._idle.set()
+            log.debug(
+                "update_handled",
+                update_id=item.update.get("update_id"),
+                lane=lane.name,
+                lag_ms=round(lag_ms),
+                duration_ms=round((time.perf_counter() - started) * 1000),
+            )
+
+    async def _handle(self, item: _Queued) -> None:
+        update_id = item.update.get("update_id")
+        try:
+            await self._dispatcher.feed_raw_update(self._bot, item.update)
+        except Exception:
+            log.exception("update_failed", update_id=update_id)
+        if item.on_done is not None:
+            try:
+                await item.on_done()
+            except Exception:
+                log.exception("update_done_failed", update_id=update_id)
+
+    def _set_busy(self, busy: int) -> None:
+        now = time.monotonic()
+        if busy >= self._workers and self._saturated_since is None:
+            self._saturated_since = now
+        elif busy < self._workers and self._saturated_since is not None:
+            self._saturated_for += now - self._saturated_since
+            self._saturated_since = None
+        self._busy = busy
+
+    async def _report(self) -> None:
+        while True:
+            await asyncio.sleep(self._stats_interval)
+            if self._saturated_since is not None:
+                now = time.monotonic()
+                self._saturated_for += now - self._saturated_since
+                self._saturated_since = now
+            fast = sorted(self._lags_ms[Lane.FAST])
+            slow = sorted(self._lags_ms[Lane.SLOW])
+            log.info(
+                "update_queue_stats",
+                queue_depth=self._queued,
+                ready_fast=len(self._ready[Lane.FAST]),
+                ready_slow=len(self._ready[Lane.SLOW]),
+                busy=self._busy,
+                busy_slow=self._busy_slow,
+                users_active=len(self._mailboxes),
+                handled=self._handled,
+                rejected=self._rejected,
+                saturation=round(self._saturated_for / self._stats_interval, 2),
+                lag_fast_p95_ms=round(fast[int(len(fast) * 0.95)]) if fast else 0,
+                lag_slow_p95_ms=round(slow[int(len(slow) * 0.95)]) if slow else 0,
+                lag_max_ms=round(max(fast[-1:] + slow[-1:], default=0)),
+            )
+            self._lags_ms = {lane: [] for lane in Lane}
+            self._handled = self._rejected = 0
+            self._saturated_for = 0.0
@@ -0,0 +1,205 @@
+"""Redis-stream update distribution — one ingress, many worker processes.
+
+The ingress process (webhook or poller) appends every raw update to one of
+`partitions` streams, ``updates:{n}``, picked by sender id, so all updates of
+a user land in one stream in arrival order. Workers read through the
+``workers`` consumer group; worker `index` of `count` owns the partitions with
+``n % count == index`` and is the only reader of them, which keeps each user's
+updates in order. Inside a worker an UpdateWorkerPool handles them,
+concurrently across users and serially per user.
+
+Dedup by update_id: the ingress script sets ``upd:{update_id}`` with NX and
+only then XADDs, so Telegram redeliveries and a second ingress are dropped.
+A worker acks an entry and marks the key "done" in one round trip after
+handling it. After a restart the worker re-reads its own unacked entries and
+skips the ones already done; an update interrupted mid-handler runs again.
+A lost Redis connection does not stop the worker: it reconnects with
+backoff and re-reads its unacked entries the same way, leaving alone the
+ones still in its pool and retrying the acks that failed.
+
+Entries sit in Redis until a worker acks them, so that Redis must not evict
+keys (``maxmemory-policy noeviction``) or the streams can lose updates.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any
+
+import redis.asyncio as redis
+import structlog
+from redis.exceptions import ResponseError
+
+from app.updates.pool import UpdateWorkerPool, update_sender
+
+log = structlog.get_logger()
+
+# KEYS[1] = upd:{update_id}, KEYS[2] = updates:{partition}
+# ARGV[1] = dedup TTL (s), ARGV[2] = approximate stream MAXLEN, ARGV[3] = update JSON
+# → 1 if added, 0 if the update_id was seen before
+PUBLISH_SCRIPT = """
+if not redis.call('SET', KEYS[1], 'queued', 'NX', 'EX', ARGV[1]) then
+    return 0
+end
+redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[2], '*', 'u', ARGV[3])
+return 1
+"""
+
+
+class UpdateStream:
+    """Ingress side: partitioned, deduplicated XADD of raw updates."""
+
+    PREFIX = "updates:"
+    DEDUP_PREFIX = "upd:"
+    DEDUP_TTL = 86400  # Telegram gives up redelivering after 24 h
+    MAXLEN = 100_000  # per partition; only reached if workers are down for long
+
+    def __init__(self, redis_client: redis.Redis, partitions: int = 16) -> None:
+        self._r = redis_client
+        self._partitions = partitions
+        self._publish = redis_client.register_script(PUBLISH_SCRIPT)
+
+    def stream_for(self, update: dict[str, Any]) -> str:
+        sender = update_sender(update)
+        key = sender if sender is not None else update["update_id"]
+        return f"{self.PREFIX}{key % self._partitions}"
+
+    async def put(self, update: dict[str, Any]) -> bool:
+        """Append the update; a duplicate is dropped but still counts as accepted."""
+        update_id = update["update_id"]
+        added = await self._publish(
+            keys=[f"{self.DEDUP_PREFIX}{update_id}", self.stream_for(update)],
+            args=[self.DEDUP_TTL, self.MAXLEN, json.dumps(update, ensure_ascii=False)],
+        )
+        if not added:
+            log.info("update_duplicate", update_id=update_id)
+        return True
+
+    def start(self) -> None:
+        """Nothing to start — the stream lives in Redis."""
+
+    async def stop(self) -> None:
+        """Nothing to drain — accepted updates are already in Redis."""
+
+
+class StreamConsumer:
+    """Worker side: read owned partitions and feed an UpdateWorkerPool."""
+
+    GROUP = "workers"
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        pool: UpdateWorkerPool,
+        partitions: int = 16,
+        index: int = 0,
+        count: int = 1,
+        batch: int = 100,
+        block_ms: int = 5000,
+    ) -> None:
+        self._r = redis_client
+        self._pool = pool
+        self._streams = [
+            f"{UpdateStream.PREFIX}{n}" for n in range(partitions) if n % count == index
+        ]
+        self._consumer = f"worker-{index}"
+        self._batch = batch
+        self._block_ms = block_ms
+        self._in_pool: set[str] = set()  # entry ids submitted, not handled yet
+        self._ack_owed: dict[str, int] = {}  # entry id → update id, handled, ack failed
+
+    async def run(self, max_backoff: float = 30.0) -> None:
+        """Consume until cancelled; the pool must already be started.
+
+        Redis errors restart consumption with exponential backoff; every
+        (re)start first re-reads this consumer's unacked entries.
+        """
+        backoff = 1.0
+        while True:
+            try:
+                await self._start()
+                backoff = 1.0
+                await self._consume()
+            except Exception as e:
+                log.warning(
+                    "stream_consumer_lost",
+                    consumer=self._consumer,
+                    error=repr(e),
+                    retry_in=backoff,
+                )
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, max_backoff)
+
+    async def _start(self) -> None:
+        for stream in self._streams:
+            try:
+                await self._r.xgroup_create(stream, self.GROUP, id="0", mkstream=True)
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+        log.info("stream_consumer_started", consumer=self._consumer, streams=self._streams)
+
+        # Entries delivered to this consumer before a restart and never acked
+        for stream in self._streams:
+            await self._recover(stream)
+
+    async def _consume(self) -> None:
+        while True:
+            response = await self._r.xreadgroup(
+                self.GROUP,
+                self._consumer,
+                dict.fromkeys(self._streams, ">"),
+                count=self._batch,
+                block=self._block_ms,
+            )
+            for stream, entries in response or []:
+                for entry_id, fields in entries:
+                    await self._submit(stream, entry_id, json.loads(fields["u"]))
+
+    async def _recover(self, stream: str) -> None:
+        last_id = "0"
+        while True:
+            response = await self._r.xreadgroup(
+                self.GROUP, self._consumer, {stream: last_id}, count=self._batch
+            )
+            entries = response[0][1] if response else []
+            if not entries:
+                return
+            for entry_id, fields in entries:
+                last_id = entry_id
+                if entry_id in self._in_pool:
+                    continue
+                if entry_id in self._ack_owed:
+                    await self._ack(stream, entry_id, self._ack_owed[entry_id])
+                    continue
+                if not fields:
+                    # Trimmed by MAXLEN while pending — nothing left to handle
+                    await self._r.xack(stream, self.GROUP, entry_id)
+                    continue
+                update = json.loads(fields["u"])
+                dedup_key = f"{UpdateStream.DEDUP_PREFIX}{update['update_id']}"
+                if await self._r.get(dedup_key) == "done":
+                    await self._r.xack(stream, self.GROUP, entry_id)
+                    continue
+                log.info("update_recovered", update_id=update["update_id"], stream=stream)
+                await self._submit(stream, entry_id, update)
+
+    async def _submit(self, stream: str, entry_id: str, update: dict[str, Any]) -> None:
+        async def ack() -> None:
+            self._in_pool.discard(entry_id)
+            self._ack_owed[entry_id] = update["update_id"]
+            await self._ack(stream, entry_id, update["update_id"])
+
+        # Stop reading while the pool is full; unread entries wait in Redis
+        while self._pool.full:
+            await asyncio.sleep(0.05)
+        self._in_pool.add(entry_id)
+        self._pool.submit(update, on_done=ack)
+
+    async def _ack(self, stream: str, entry_id: str, update_id: int) -> None:
+        async with self._r.pipeline(transaction=False) as pipe:
+            pipe.xack(stream, self.GROUP, entry_id)
+            pipe.set(f"{UpdateStream.DEDUP_PREFIX}{update_id}", "done", xx=True, keepttl=True)
+            await pipe.execute()
+        del self._ack_owed[entry_id]
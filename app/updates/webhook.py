@@ -0,0 +1,68 @@
+"""Ack-fast webhook — check the secret, queue the update, answer 200 at once.
+
+aiogram's SimpleRequestHandler also answers at once, but it starts one
+background task per update with no upper bound and no ordering, so a burst
+piles up unlimited concurrent handlers and one user's updates can race each
+other. Here the request hands the update to an UpdateSink — the bounded,
+per-user-ordered UpdateWorkerPool, or the Redis UpdateStream in multi-instance
+mode. When the sink refuses (queue full) the answer is 503: Telegram retries
+later instead of the bot taking on more work than it can handle.
+"""
+
+from __future__ import annotations
+
+import hmac
+from typing import Any, Protocol
+
+from aiohttp import web
+
+
+class UpdateSink(Protocol):
+    """Where accepted updates go."""
+
+    async def put(self, update: dict[str, Any]) -> bool: ...
+
+    def start(self) -> None: ...
+
+    async def stop(self) -> None: ...
+
+
+class QueuedRequestHandler:
+    """aiohttp endpoint for Telegram webhooks backed by an UpdateSink."""
+
+    SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+    def __init__(self, sink: UpdateSink, secret_token: str = "") -> None:
+        self._sink = sink
+        self._secret = secret_token.encode()
+
+    def register(self, app: web.Application, path: str) -> None:
+        """Add the route and start/stop the sink with the app.
+
+        Call before aiogram's ``setup_application`` so the sink drains before
+        the dispatcher's shutdown closes Redis and the DB engine.
+        """
+        app.router.add_post(path, self.handle)
+        app.on_startup.append(self._on_startup)
+        app.on_shutdown.append(self._on_shutdown)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if self._secret:
+            received = request.headers.get(self.SECRET_HEADER, "").encode()
+            if not hmac.compare_digest(received, self._secret):
+                return web.Response(status=401)
+        try:
+            update = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+        if not isinstance(update, dict):
+            return web.Response(status=400)
+        if not await self._sink.put(update):
+            return web.Response(status=503)
+        return web.Response()
+
+    async def _on_startup(self, app: web.Application) -> None:
+        self._sink.start()
+
+    async def _on_shutdown(self, app: web.Application) -> None:
+        await self._sink.stop()
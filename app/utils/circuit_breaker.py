@@ -0,0 +1,99 @@
+"""Circuit breaker — stop calling a dependency that keeps failing.
+
+After `threshold` consecutive failures (timeouts, connection errors, pool
+exhaustion) the breaker opens and every call fails at once with
+`ServiceBusyError`, without touching the dependency, for `reset_after`
+seconds. Then one probe call is let through: success closes the breaker,
+failure opens it again. Errors that are not `failures` (bugs, bad input)
+pass through untouched and do not count; neither does a TimeoutError other
+than the guard's own deadline.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import structlog
+
+log = structlog.get_logger()
+
+
+class ServiceBusyError(Exception):
+    """A dependency is overloaded or down — try again a bit later."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker for one dependency (Postgres, Redis)."""
+
+    def __init__(
+        self,
+        name: str,
+        failures: tuple[type[BaseException], ...],
+        threshold: int = 5,
+        reset_after: float = 10.0,
+    ) -> None:
+        self.name = name
+        self._failures = failures
+        self._threshold = threshold
+        self._reset_after = reset_after
+        self._failed = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    @asynccontextmanager
+    async def guard(self, timeout: float | None = None) -> AsyncIterator[None]:
+        """Run the block through the breaker, optionally with a deadline.
+
+        Raises:
+            ServiceBusyError: The breaker is open, or the block failed with
+                one of `failures` or ran past `timeout`.
+        """
+        probe = self._admit()
+        deadline = asyncio.timeout(timeout)
+        try:
+            async with deadline:
+                yield
+        except self._failures as e:
+            raise self.failed(e) from e
+        except TimeoutError as e:
+            if not deadline.expired():
+                raise
+            raise self.failed(e) from e
+        finally:
+            if probe:
+                self._probing = False
+        self._on_success()
+
+    def failed(self, error: BaseException) -> ServiceBusyError:
+        """Count a failure seen outside `guard`; returns the error to raise instead."""
+        self._on_failure(error)
+        return ServiceBusyError(self.name)
+
+    def _admit(self) -> bool:
+        """Raise if calls are blocked; True if this call is the half-open probe."""
+        if self._opened_at is None:
+            return False
+        if self._probing or time.monotonic() - self._opened_at < self._reset_after:
+            raise ServiceBusyError(self.name)
+        self._probing = True
+        return True
+
+    def _on_failure(self, error: BaseException) -> None:
+        self._failed += 1
+        if self._opened_at is not None or self._failed >= self._threshold:
+            if self._opened_at is None:
+                log.error("circuit_open", dependency=self.name, error=repr(error))
+            self._opened_at = time.monotonic()
+
+    def _on_success(self) -> None:
+        if self._opened_at is not None:
+            log.info("circuit_closed", dependency=self.name)
+        self._failed = 0
+        self._opened_at = None
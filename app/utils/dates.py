@@ -0,0 +1,26 @@
+"""Date utilities — calendar periods in the user's timezone."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+
+def month_bounds(year: int, month: int, tz: str = "UTC") -> tuple[datetime, datetime]:
+    """Half-open ``[month_start, next_month_start)`` range for a month in `tz`.
+
+    Both ends are timezone-aware, so comparing them with a timestamptz column
+    stays index-friendly (no ``extract()`` on the column).
+    """
+    zone = ZoneInfo(tz)
+    start = datetime(year, month, 1, tzinfo=zone)
+    if month == 12:
+        end = datetime(year + 1, 1, 1, tzinfo=zone)
+    else:
+        end = datetime(year, month + 1, 1, tzinfo=zone)
+    return start, end
+
+
+def now_in(tz: str) -> datetime:
+    """Current time in the given IANA timezone."""
+    return datetime.now(ZoneInfo(tz))
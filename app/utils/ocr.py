@@ -1,17 +1,46 @@
 """OCR utilities — extract amounts from bank app screenshots.
 
 Copied from old ocr.py with minimal changes (Decimal instead of float).
+
+Before Tesseract, screenshots are preprocessed: grayscale, downscaled to at
+most MAX_OCR_WIDTH, binarized with an Otsu threshold (dark themes inverted to
+dark-on-light) and optionally cropped to AMOUNT_REGION. Together with picking
+the smallest adequate Telegram photo size this is what keeps OCR time down.
+
+Tesseract is fed through pipes (``tesseract stdin stdout``), not through
+pytesseract.image_to_string, which writes the image and the recognized
+text to temp files on every call.
 """
 
 from __future__ import annotations
 
+import io
 import re
+import subprocess
+import time
 from dataclasses import dataclass
 from decimal import Decimal, InvalidOperation
+from typing import TYPE_CHECKING, Sequence
 
 import pytesseract
 from PIL import Image
 
+if TYPE_CHECKING:
+    from aiogram.types import PhotoSize
+
+MIN_OCR_WIDTH = 720  # narrowest photo size Tesseract still reads reliably
+MAX_OCR_WIDTH = 1280  # wider images are downscaled before OCR
+# (left, top, right, bottom) as fractions — where bank apps show the amount
+AMOUNT_REGION = (0.0, 0.05, 1.0, 0.55)
+
+DHASH_SIZE = 64  # hash grid is DHASH_SIZE × DHASH_SIZE brightness gradients
+DHASH_MARGIN = 6  # gray levels; smaller steps (JPEG noise) count as flat
+# Differing cells (of 4096) still treated as the same image: re-encoded and
+# resized copies of one screenshot measured up to ~50. Another amount on the
+# same app screen is only ~5 cells away, so the hash alone never decides —
+# OCRCache.is_duplicate also requires the same amount
+DUPLICATE_MAX_DISTANCE = 64
+
 
 @dataclass
 class OCRResult:
@@ -20,24 +49,165 @@ class OCRResult:
     amount: Decimal
     description: str
     raw_text: str
+    duplicate: bool = False  # same file, or same amount on a near-identical image, seen before
+
+
+@dataclass(frozen=True, slots=True)
+class ImageHash:
+    """Difference hash (dHash): which grid cells get brighter / darker to the right."""
+
+    rising: int
+    falling: int
+
+    def distance(self, other: ImageHash) -> int:
+        """Number of grid cells whose gradient differs."""
+        return ((self.rising ^ other.rising) | (self.falling ^ other.falling)).bit_count()
+
+    def to_str(self) -> str:
+        return f"{self.rising:x}:{self.falling:x}"
+
+    @classmethod
+    def from_str(cls, value: str) -> ImageHash:
+        rising, falling = value.split(":")
+        return cls(int(rising, 16), int(falling, 16))
+
+
+def difference_hash(image: bytes) -> ImageHash:
+    """Difference hash of an encoded image, stable under re-compression and resizing.
 
+    The image is shrunk to (DHASH_SIZE + 1) × DHASH_SIZE and every horizontal
+    neighbour pair is classed as rising, falling or flat (within DHASH_MARGIN).
+    Screens of one bank app differ in a handful of cells only, so a small
+    distance means "looks alike", not "same receipt".
+    """
+    img = Image.open(io.BytesIO(image))
+    img.draft("L", (DHASH_SIZE * 4, DHASH_SIZE * 4))  # JPEG: decode at reduced scale
+    thumb = img.convert("L").resize((DHASH_SIZE + 1, DHASH_SIZE), Image.Resampling.BOX)
+    px = thumb.tobytes()
+
+    rising = falling = 0
+    bit = 1
+    for row in range(DHASH_SIZE):
+        offset = row * (DHASH_SIZE + 1)
+        for col in range(offset, offset + DHASH_SIZE):
+            left, right = px[col], px[col + 1]
+            if right > left + DHASH_MARGIN:
+                rising |= bit
+            elif left > right + DHASH_MARGIN:
+                falling |= bit
+            bit <<= 1
+    return ImageHash(rising, falling)
+
+
+def pick_photo_size(sizes: Sequence[PhotoSize]) -> PhotoSize:
+    """Smallest Telegram photo size at least MIN_OCR_WIDTH wide (else the largest)."""
+    for size in sorted(sizes, key=lambda s: s.width):
+        if size.width >= MIN_OCR_WIDTH:
+            return size
+    return max(sizes, key=lambda s: s.width)
+
+
+def extract_amount_from_image(
+    image: bytes, crop: bool = False, timeout: float | None = None
+) -> OCRResult | None:
+    """Extract amount and description from a bank app screenshot using Tesseract OCR.
+
+    Args:
+        image: Encoded image file contents (JPEG/PNG), as downloaded from Telegram.
+        crop: OCR only AMOUNT_REGION first, falling back to the whole image.
+        timeout: Seconds for all Tesseract runs together; past it Tesseract is
+            killed and None returned.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    def remaining() -> float | None:
+        return None if deadline is None else max(deadline - time.monotonic(), 0.0)
 
-def extract_amount_from_image(image_path: str) -> OCRResult | None:
-    """Extract amount and description from a bank app screenshot using Tesseract OCR."""
     try:
-        img = Image.open(image_path)
-        text = pytesseract.image_to_string(img, lang="rus+eng")
+        img = Image.open(io.BytesIO(image))
+        if crop:
+            text = run_tesseract(preprocess_image(img, crop=True), timeout=remaining())
+            result = parse_ocr_text(text)
+            if result is not None:
+                return result
+        text = run_tesseract(preprocess_image(img), timeout=remaining())
     except Exception:
         return None
 
     return parse_ocr_text(text)
 
 
+def run_tesseract(img: Image.Image, lang: str = "rus+eng", timeout: float | None = None) -> str:
+    """Recognize text in an image, passing it over stdin and reading stdout.
+
+    Raises:
+        subprocess.CalledProcessError: Tesseract failed.
+        subprocess.TimeoutExpired: Tesseract ran past `timeout` and was killed.
+    """
+    png = io.BytesIO()
+    img.save(png, format="PNG")
+    proc = subprocess.run(
+        [pytesseract.pytesseract.tesseract_cmd, "stdin", "stdout", "-l", lang],
+        input=png.getvalue(),
+        capture_output=True,
+        check=True,
+        timeout=timeout,
+    )
+    return proc.stdout.decode("utf-8", errors="replace")
+
+
+def preprocess_image(img: Image.Image, crop: bool = False) -> Image.Image:
+    """Grayscale, downscale, binarize (and optionally crop) a screenshot for Tesseract."""
+    gray = img.convert("L")
+
+    if crop:
+        left, top, right, bottom = AMOUNT_REGION
+        w, h = gray.size
+        gray = gray.crop((int(left * w), int(top * h), int(right * w), int(bottom * h)))
+
+    if gray.width > MAX_OCR_WIDTH:
+        height = round(gray.height * MAX_OCR_WIDTH / gray.width)
+        gray = gray.resize((MAX_OCR_WIDTH, height), Image.Resampling.BILINEAR)
+
+    histogram = gray.histogram()
+    threshold = _otsu_threshold(histogram)
+    # Tesseract expects dark text on a light background — invert dark themes
+    dark_background = sum(histogram[: threshold + 1]) > sum(histogram[threshold + 1 :])
+    lut = [
+        (0 if p > threshold else 255) if dark_background else (255 if p > threshold else 0)
+        for p in range(256)
+    ]
+    return gray.point(lut)
+
+
+def _otsu_threshold(histogram: list[int]) -> int:
+    """Gray level that best separates a 256-bin histogram into two classes."""
+    total = sum(histogram)
+    sum_all = sum(i * count for i, count in enumerate(histogram))
+    sum_bg = weight_bg = 0
+    best_variance, threshold = 0.0, 127
+
+    for i, count in enumerate(histogram):
+        weight_bg += count
+        if weight_bg == 0:
+            continue
+        weight_fg = total - weight_bg
+        if weight_fg == 0:
+            break
+        sum_bg += i * count
+        mean_diff = sum_bg / weight_bg - (sum_all - sum_bg) / weight_fg
+        variance = weight_bg * weight_fg * mean_diff * mean_diff
+        if variance > best_variance:
+            best_variance, threshold = variance, i
+
+    return threshold
+
+
 def parse_ocr_text(text: str) -> OCRResult | None:
     """Parse OCR text to find amount and description."""
     lines = [line.strip() for line in text.split("\n") if line.strip()]
 
-    amount = _find_amount(text)
+    amount = _find_amount(lines)
     if amount is None:
         return None
 
@@ -50,44 +220,78 @@ def parse_ocr_text(text: str) -> OCRResult | None:
     )
 
 
-def _find_amount(text: str) -> Decimal | None:
-    """Find the most likely payment amount in OCR text."""
-    patterns = [
-        r"[-\u2212\u2013]\s*([\d\s]+[.,]\d{2})\b",
-        r"(?:сумма|итого|всего|оплата|списан[оа]?|перевод)\s*:?\s*([\d\s]+[.,]?\d*)",
-        r"([\d\s]+[.,]\d{2})\s*(?:сум|сўм|UZS|USD|руб|₽|\$)",
-        r"([\d\s]+[.,]\d{2})",
-    ]
+# A number, with its sign and currency, as bank apps print amounts:
+# "-125 000.00 сум", "1234,5", "UZS" suffixes. Dates like 12.05.2025 and the
+# parts of a time like 14:30 never match, so "14:30 125 000" can't merge into one.
+_CANDIDATE_RE = re.compile(
+    r"(?<![\w.,:])"
+    r"(?P<minus>[-\u2212\u2013]\s?)?"
+    r"(?P<number>\d{1,3}(?:[ \u00a0]\d{3})+|\d+)"
+    r"(?:[.,](?P<fraction>\d{1,2}))?"
+    r"(?![\d]|[.,:]\d)"
+    r"\s*(?P<currency>сум|сўм|so['ʻ]?m|uzs|usd|руб|₽|\$)?",
+    re.IGNORECASE,
+)
+# Words that make the number after them (same or next line) the payment amount…
+_AMOUNT_CONTEXT_RE = re.compile(r"сумма|итого|всего|оплат|списан|перевод|плат[её]ж", re.I)
+# …and words that make it something else
+_OTHER_CONTEXT_RE = re.compile(r"баланс|остаток|комисси|кэшб[эе]к|лимит|доступно", re.I)
+
 
-    amounts: list[Decimal] = []
-    for pattern in patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
-            cleaned = match.replace(" ", "").replace(",", ".")
+def _find_amount(lines: list[str]) -> Decimal | None:
+    """Find the most likely payment amount in OCR lines.
+
+    Every number is scored by its context — minus sign, "сумма/итого" before it
+    (or on the line above), currency suffix, kopecks, thousands grouping — and
+    the best score wins; the value only breaks ties. Bare integers without any
+    of the strong signals are not amounts (times, card digits, ids).
+    """
+    best: tuple[int, Decimal] | None = None
+    label_above = False
+
+    for line in lines:
+        found = False
+        for match in _CANDIDATE_RE.finditer(line):
+            minus, fraction, currency = match.group("minus", "fraction", "currency")
+            prefix = line[: match.start()]
+            keyword = label_above or _AMOUNT_CONTEXT_RE.search(prefix) is not None
+            if not (minus or fraction or currency or keyword):
+                continue
+
+            score = (
+                3 * bool(minus)
+                + 3 * keyword
+                + 2 * bool(currency)
+                + bool(fraction)
+                + (" " in match.group("number") or "\u00a0" in match.group("number"))
+                - 4 * (_OTHER_CONTEXT_RE.search(prefix) is not None)
+            )
+            digits = match.group("number").replace(" ", "").replace("\u00a0", "")
             try:
-                value = Decimal(cleaned)
-                if value > 0:
-                    amounts.append(value)
-            except (InvalidOperation, ValueError):
+                value = Decimal(f"{digits}.{fraction}" if fraction else digits)
+            except InvalidOperation:
+                continue
+            if value <= 0:
                 continue
 
-    if not amounts:
-        return None
+            found = True
+            if best is None or (score, value) > best:
+                best = (score, value)
+
+        label_above = not found and _AMOUNT_CONTEXT_RE.search(line) is not None
+
+    return best[1] if best else None
 
-    return max(amounts)
+
+_SKIP_LINE_RE = re.compile(r"сумма|итого|баланс|комиссия|дата|время|номер", re.I)
+_NUMERIC_LINE_RE = re.compile(r"^[\d\s.,:%+\-\u2212\u2013]+$")
 
 
 def _find_description(lines: list[str]) -> str:
     """Try to extract a meaningful description from OCR text."""
-    skip_words = {"сумма", "итого", "баланс", "комиссия", "дата", "время", "номер"}
-
     for line in lines:
-        lower = line.lower()
-        if any(word in lower for word in skip_words):
-            continue
-        if re.match(r"^[\d\s.,:%+\-\u2212\u2013]+$", line):
+        if len(line) <= 3 or _SKIP_LINE_RE.search(line) or _NUMERIC_LINE_RE.match(line):
             continue
-        if len(line) > 3:
-            return line[:100]
+        return line[:100]
 
     return "Платёж (из скриншота)"
@@ -0,0 +1,26 @@
+"""Rebuild monthly_rollups from raw transactions.
+
+Usage:
+    python -m scripts.backfill_rollups              # all users
+    python -m scripts.backfill_rollups <user_id>    # one user (DB id)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+
+from app.db.session import get_session
+from app.repositories.rollup_repo import RollupRepository
+
+
+async def backfill(user_id: int | None = None) -> None:
+    async with get_session() as session:
+        await RollupRepository(session).rebuild(user_id)
+        await session.commit()
+    target = f"user {user_id}" if user_id is not None else "all users"
+    print(f"✅ Rebuilt monthly rollups for {target}")
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill(int(sys.argv[1]) if len(sys.argv) > 1 else None))
@@ -0,0 +1,83 @@
+"""Micro-benchmark: category keyboard construction + serialization per message.
+
+Compares building a fresh InlineKeyboardMarkup for every expense message (the
+old behaviour) with the memoized `build_category_keyboard`, and measures the
+cost of serializing the markup the way aiogram does before sending.
+No database or network needed.
+
+Usage:
+    python -m scripts.bench_category_keyboard [iterations] [custom_categories]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from collections.abc import Callable
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from app.cache.category_catalogue import CategorySnapshot
+from app.keyboards.categories import build_category_keyboard
+from scripts.seed_categories import DEFAULT_CATEGORIES
+
+
+def _fresh_keyboard(categories: tuple[CategorySnapshot, ...]) -> InlineKeyboardMarkup:
+    """The pre-memoization builder: new pydantic objects on every call."""
+    buttons = []
+    for i in range(0, len(categories), 2):
+        buttons.append(
+            [
+                InlineKeyboardButton(text=c.label, callback_data=f"cat:{c.id}")
+                for c in categories[i : i + 2]
+            ]
+        )
+    buttons.append([InlineKeyboardButton(text="➕ Новая категория", callback_data="newcat")])
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
+
+
+def _time(fn: Callable[[], object], iterations: int) -> float:
+    """Mean microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(iterations: int, custom_count: int) -> None:
+    defaults = tuple(
+        CategorySnapshot(id=i, key=key, label=label, icon=icon, is_default=True)
+        for i, (key, label, icon) in enumerate(DEFAULT_CATEGORIES, start=1)
+    )
+    custom = tuple(
+        CategorySnapshot(
+            id=1000 + i, key=f"custom_{i}", label=f"🏷 Своя {i}", icon="🏷", is_default=False
+        )
+        for i in range(custom_count)
+    )
+    categories = defaults + custom
+
+    bot = Bot("1:benchmark")
+    session = AiohttpSession()
+
+    def serialize(markup: InlineKeyboardMarkup) -> object:
+        return session.prepare_value(markup, bot=bot, files={})
+
+    fresh_build = _time(lambda: _fresh_keyboard(categories), iterations)
+    memo_build = _time(lambda: build_category_keyboard(categories), iterations)
+    fresh_total = _time(lambda: serialize(_fresh_keyboard(categories)), iterations)
+    memo_total = _time(lambda: serialize(build_category_keyboard(categories)), iterations)
+
+    print(f"{len(defaults)} default + {custom_count} custom categories, {iterations:,} iterations")
+    print(f"{'':<12}{'build':>12}{'build+serialize':>18}")
+    print(f"{'fresh':<12}{fresh_build:>10.1f}µs{fresh_total:>16.1f}µs")
+    print(f"{'memoized':<12}{memo_build:>10.1f}µs{memo_total:>16.1f}µs")
+    print(f"speed-up per message: {fresh_total / memo_total:.1f}x")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    iterations, custom_count = (args + [20_000, 3][len(args):])[:2]
+    main(iterations, custom_count)
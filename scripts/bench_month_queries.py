@@ -0,0 +1,158 @@
+"""Benchmark: extract(year/month) filters vs half-open created_at ranges.
+
+Seeds `transactions` with a few million rows for throwaway users, then prints
+the EXPLAIN ANALYZE plan and median latency of the month queries used by
+TransactionRepository:
+
+* before — the old ``extract()`` predicates, with the 002 indexes dropped
+  (inside a transaction that is rolled back, so nothing is lost);
+* after  — ``created_at >= :start AND created_at < :end`` with all indexes.
+
+Run against a disposable database only — it takes heavy locks while seeding.
+
+Usage:
+    python -m scripts.bench_month_queries [rows] [users]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import statistics
+import sys
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.config import get_settings
+from app.utils.dates import month_bounds
+
+TG_ID_BASE = 9_200_000_000  # outside real Telegram ids, removed afterwards
+YEAR, MONTH, TZ = 2025, 6, "Asia/Tashkent"
+RUNS = 20
+
+SEED_USERS = text(
+    """
+    INSERT INTO users (telegram_id, first_name)
+    SELECT CAST(:base AS bigint) + g, 'bench' FROM generate_series(1, :users) g
+    RETURNING id
+    """
+)
+SEED_FAMILY = text(
+    "INSERT INTO families (name, owner_id) VALUES ('bench', :owner) RETURNING id"
+)
+SEED_TRANSACTIONS = text(
+    """
+    INSERT INTO transactions
+        (user_id, family_id, type, amount, amount_base, category_id, created_at)
+    SELECT
+        u.ids[1 + (g % array_length(u.ids, 1))],
+        CASE WHEN g % 10 = 0 THEN CAST(:family_id AS bigint) END,
+        CASE WHEN g % 5 = 0 THEN 'income' ELSE 'expense' END,
+        (g % 500000) + 1000,
+        (g % 500000) + 1000,
+        c.ids[1 + (g % array_length(c.ids, 1))],
+        now() - (g % (3 * 365 * 24 * 60)) * interval '1 minute'
+    FROM generate_series(1, :rows) g,
+         (SELECT CAST(:user_ids AS bigint[]) AS ids) u,
+         (SELECT array_agg(id) AS ids FROM categories) c
+    """
+)
+
+QUERIES = {
+    "get_by_month": (
+        "SELECT * FROM transactions WHERE user_id = :user_id"
+        " AND extract(year FROM created_at) = :year"
+        " AND extract(month FROM created_at) = :month ORDER BY created_at DESC",
+        "SELECT * FROM transactions WHERE user_id = :user_id"
+        " AND created_at >= :start AND created_at < :end ORDER BY created_at DESC",
+    ),
+    "get_by_family_month": (
+        "SELECT * FROM transactions WHERE family_id = :family_id"
+        " AND extract(year FROM created_at) = :year"
+        " AND extract(month FROM created_at) = :month ORDER BY created_at DESC",
+        "SELECT * FROM transactions WHERE family_id = :family_id"
+        " AND created_at >= :start AND created_at < :end ORDER BY created_at DESC",
+    ),
+    "get_category_total": (
+        "SELECT coalesce(sum(amount_base), 0) FROM transactions"
+        " WHERE user_id = :user_id AND category_id = :category_id AND type = 'expense'"
+        " AND extract(year FROM created_at) = :year"
+        " AND extract(month FROM created_at) = :month",
+        "SELECT coalesce(sum(amount_base), 0) FROM transactions"
+        " WHERE user_id = :user_id AND category_id = :category_id AND type = 'expense'"
+        " AND created_at >= :start AND created_at < :end",
+    ),
+}
+
+
+async def _measure(conn: AsyncConnection, sql: str, params: dict) -> tuple[str, float]:
+    plan = await conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), params)
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        await conn.execute(text(sql), params)
+        timings.append((time.perf_counter() - start) * 1000)
+    return "\n".join(row[0] for row in plan), statistics.median(timings)
+
+
+async def main(rows: int, users: int) -> None:
+    engine = create_async_engine(get_settings().database_url)
+    start, end = month_bounds(YEAR, MONTH, TZ)
+
+    async with engine.begin() as conn:
+        result = await conn.execute(SEED_USERS, {"base": TG_ID_BASE, "users": users})
+        user_ids = list(result.scalars())
+        family_id = (await conn.execute(SEED_FAMILY, {"owner": user_ids[0]})).scalar_one()
+        print(f"Seeding {rows:,} transactions for {users} users...", flush=True)
+        await conn.execute(
+            SEED_TRANSACTIONS, {"rows": rows, "user_ids": user_ids, "family_id": family_id}
+        )
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE transactions"))
+
+    async with engine.connect() as conn:
+        category_id = (
+            await conn.execute(
+                text("SELECT category_id FROM transactions WHERE user_id = :u LIMIT 1"),
+                {"u": user_ids[0]},
+            )
+        ).scalar_one()
+    params = {
+        "user_id": user_ids[0],
+        "family_id": family_id,
+        "category_id": category_id,
+        "year": YEAR,
+        "month": MONTH,
+        "start": start,
+        "end": end,
+    }
+
+    try:
+        for name, (old_sql, new_sql) in QUERIES.items():
+            async with engine.connect() as conn:
+                trans = await conn.begin()
+                await conn.execute(text("DROP INDEX ix_transaction_family_created"))
+                await conn.execute(text("DROP INDEX ix_transaction_user_category_created"))
+                old_plan, old_ms = await _measure(conn, old_sql, params)
+                await trans.rollback()
+            async with engine.connect() as conn:
+                new_plan, new_ms = await _measure(conn, new_sql, params)
+
+            print(f"\n══ {name}: before {old_ms:.2f} ms → after {new_ms:.2f} ms (median)")
+            print(f"── before\n{old_plan}\n── after\n{new_plan}")
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text("DELETE FROM families WHERE id = :id"), {"id": family_id})
+            await conn.execute(
+                text("DELETE FROM users WHERE telegram_id > :base AND telegram_id <= :top"),
+                {"base": TG_ID_BASE, "top": TG_ID_BASE + users},
+            )
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    rows, users = (args + [3_000_000, 50][len(args):])[:2]
+    asyncio.run(main(rows, users))
@@ -0,0 +1,110 @@
+"""Benchmark: OCR latency and accuracy with and without preprocessing.
+
+Runs every screenshot of a fixture corpus through Tesseract three ways —
+the raw image (the old path), `preprocess_image`, and `preprocess_image` with
+the amount-region crop — and prints median latency and how many amounts were
+read correctly. Needs the tesseract binary with rus+eng data.
+
+A corpus is a directory of images plus ``expected.json`` mapping each file name
+to the amount it shows (``{"kapital_01.jpg": "125000.00"}``). Real screenshots
+are not committed; ``--generate`` writes a synthetic corpus of light and dark
+bank-app-like screens to start from.
+
+Usage:
+    python -m scripts.bench_ocr CORPUS_DIR
+    python -m scripts.bench_ocr --generate CORPUS_DIR [count]
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import statistics
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFont
+
+from app.utils.ocr import AMOUNT_REGION, parse_ocr_text, preprocess_image, run_tesseract
+
+FONT = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+MERCHANTS = ["Korzinka", "Yandex Go", "Makro", "Uzum Market", "Evos", "Beeline"]
+
+
+def generate(corpus: Path, count: int) -> None:
+    """Write `count` synthetic 1080×2340 screenshots and expected.json."""
+    corpus.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(42)
+    expected = {}
+    big, small = ImageFont.truetype(FONT, 72), ImageFont.truetype(FONT, 40)
+
+    for i in range(count):
+        dark = i % 3 == 0
+        bg, fg = ((18, 18, 20), (235, 235, 235)) if dark else ((250, 250, 250), (20, 20, 20))
+        img = Image.new("RGB", (1080, 2340), bg)
+        draw = ImageDraw.Draw(img)
+        amount = Decimal(rng.randrange(1_000_00, 5_000_000_00)) / 100
+        amount_text = f"{amount:,.2f}".replace(",", " ")
+        top = int(AMOUNT_REGION[1] * 2340) + rng.randrange(100, 500)
+
+        draw.text((80, top - 120), rng.choice(MERCHANTS), font=small, fill=fg)
+        draw.text((80, top), f"-{amount_text} сум", font=big, fill=fg)
+        draw.text((80, top + 160), "Оплата картой •• 4417", font=small, fill=fg)
+        draw.text((80, 1700), f"Баланс: {rng.randrange(10**5, 10**8):,} сум", font=small, fill=fg)
+
+        name = f"synthetic_{i:03d}.jpg"
+        img.save(corpus / name, quality=85)
+        expected[name] = str(amount)
+
+    (corpus / "expected.json").write_text(json.dumps(expected, indent=2))
+    print(f"Wrote {count} screenshots to {corpus}")
+
+
+def _ocr(img: Image.Image) -> tuple[Decimal | None, float]:
+    start = time.perf_counter()
+    text = run_tesseract(img)
+    elapsed = (time.perf_counter() - start) * 1000
+    result = parse_ocr_text(text)
+    return (result.amount if result else None), elapsed
+
+
+def main(corpus: Path) -> None:
+    expected = json.loads((corpus / "expected.json").read_text())
+    variants = {
+        "raw": lambda img: img,
+        "preprocessed": preprocess_image,
+        "preprocessed+crop": lambda img: preprocess_image(img, crop=True),
+    }
+    timings: dict[str, list[float]] = {name: [] for name in variants}
+    correct = dict.fromkeys(variants, 0)
+    prep_ms: list[float] = []
+
+    for name, amount in expected.items():
+        img = Image.open(corpus / name)
+        img.load()
+        start = time.perf_counter()
+        preprocess_image(img)
+        prep_ms.append((time.perf_counter() - start) * 1000)
+
+        for variant, prepare in variants.items():
+            found, elapsed = _ocr(prepare(img))
+            timings[variant].append(elapsed)
+            correct[variant] += found == Decimal(amount)
+
+    print(f"{len(expected)} screenshots from {corpus}")
+    print(f"preprocessing alone: {statistics.median(prep_ms):.1f} ms median\n")
+    print(f"{'':<20}{'median ms':>10}{'p90 ms':>9}{'accuracy':>10}")
+    for variant, values in timings.items():
+        values.sort()
+        p90 = values[int(len(values) * 0.9)]
+        accuracy = correct[variant] / len(expected)
+        print(f"{variant:<20}{statistics.median(values):>10.0f}{p90:>9.0f}{accuracy:>10.0%}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--generate"]:
+        generate(Path(sys.argv[2]), int(sys.argv[3]) if len(sys.argv) > 3 else 30)
+    else:
+        main(Path(sys.argv[1]))
@@ -0,0 +1,130 @@
+"""Micro-benchmark: OCR text parsing, legacy multi-regex max() vs scored scanner.
+
+Generates thousands of OCR-like texts from bank receipt templates (with
+balances, commissions, dates, times, card digits and OCR noise around the
+real amount) and prints time per text and how often each parser picks the
+amount that was actually paid. No Tesseract or network needed.
+
+The templates were written alongside the scorer, so their score mostly shows
+that nothing regressed. ADVERSARIAL holds hand-written lines that broke a
+parser at some point (a time in front of the amount, amounts split across
+lines, misread characters); its misses are printed one by one.
+
+Usage:
+    python -m scripts.bench_ocr_parsing [texts]
+"""
+
+from __future__ import annotations
+
+import random
+import re
+import sys
+import time
+from decimal import Decimal, InvalidOperation
+
+from app.utils.ocr import _find_amount
+
+MERCHANTS = ["KORZINKA", "Yandex Go", "Makro", "Uzum Market", "EVOS", "Beeline", "Click"]
+TEMPLATES = [
+    "{merchant}\n-{amount} сум\nОплата картой •• {card}\n{date} {time}\nБаланс: {balance} сум",
+    "Перевод выполнен\nСумма\n{amount}\nКомиссия {fee}\nПолучатель: {merchant}\n{date}",
+    "{date} {time}\n{merchant}\nИтого {amount} UZS\nКэшбэк {fee} сум\nОстаток {balance}",
+    "Чек № {card}\n{merchant}\nСписано: {amount} сум\nДоступно {balance} сум",
+    "Оплата\n{time} {amount} сум\n{merchant}\n{date}",
+    "{merchant} {time}\nПеревод\n{amount}\nБаланс {balance}",
+]
+
+# (OCR text, amount actually paid)
+ADVERSARIAL: list[tuple[str, Decimal]] = [
+    ("Оплата\n14:30 125 000 сум", Decimal("125000")),
+    ("Сегодня, 09:05\nKORZINKA\n-48 700,00 сум", Decimal("48700.00")),
+    ("Click 23:59 -15 000 UZS\nБаланс 1 250 000 сум", Decimal("15000")),
+    ("Сумма\n 2 000 000\nКомиссия 10 000\n12.05.2025 18:40", Decimal("2000000")),
+    ("Перевод 18:40\n350 000,00\nОстаток 7 420 113,55", Decimal("350000.00")),
+    ("Итого: 87 500 сум 14:02", Decimal("87500")),
+    ("Время 08:15\nСписано 12 345,67 UZS", Decimal("12345.67")),
+    ("-1 200 000 сум\nКэшбэк 12 000 сум\nЛимит 5 000 000", Decimal("1200000")),
+    ("Uzum Market\n\u2212 259 900 so\u02bbm\n21.03.2025 в 10:10", Decimal("259900")),
+    ("Платёж принят\nНомер 000482913\nСумма 64 000\nКарта 8600 **** 4417", Decimal("64000")),
+    ("Оплата картой 4417\n02:00\n-9 990 сум", Decimal("9990")),
+    ("Доступно 3 000 000,00\nПеревод выполнен\n500 000 сум", Decimal("500000")),
+]
+
+
+def _money(rng: random.Random, low: int, high: int) -> tuple[str, Decimal]:
+    value = Decimal(rng.randrange(low * 100, high * 100)) / 100
+    text = f"{value:,.2f}".replace(",", " ")
+    if rng.random() < 0.3:
+        text = text.replace(".", ",")
+    return text, value
+
+
+def make_corpus(count: int) -> list[tuple[str, Decimal]]:
+    rng = random.Random(7)
+    corpus = []
+    for _ in range(count):
+        amount_text, amount = _money(rng, 1_000, 3_000_000)
+        balance_text, _ = _money(rng, 100_000, 90_000_000)
+        fee_text, _ = _money(rng, 10, 20_000)
+        text = rng.choice(TEMPLATES).format(
+            merchant=rng.choice(MERCHANTS),
+            amount=amount_text,
+            balance=balance_text,
+            fee=fee_text,
+            card=rng.randrange(1000, 9999),
+            date=f"{rng.randrange(1, 29):02d}.{rng.randrange(1, 13):02d}.2025",
+            time=f"{rng.randrange(24):02d}:{rng.randrange(60):02d}",
+        )
+        corpus.append((text, amount))
+    return corpus
+
+
+def legacy_find_amount(text: str) -> Decimal | None:
+    """The pre-scoring implementation: four regexes, max() of every match."""
+    patterns = [
+        r"[-−–]\s*([\d\s]+[.,]\d{2})\b",
+        r"(?:сумма|итого|всего|оплата|списан[оа]?|перевод)\s*:?\s*([\d\s]+[.,]?\d*)",
+        r"([\d\s]+[.,]\d{2})\s*(?:сум|сўм|UZS|USD|руб|₽|\$)",
+        r"([\d\s]+[.,]\d{2})",
+    ]
+    amounts: list[Decimal] = []
+    for pattern in patterns:
+        for match in re.findall(pattern, text, re.IGNORECASE):
+            cleaned = match.replace(" ", "").replace(",", ".")
+            try:
+                value = Decimal(cleaned)
+                if value > 0:
+                    amounts.append(value)
+            except (InvalidOperation, ValueError):
+                continue
+    return max(amounts) if amounts else None
+
+
+def _scored_find_amount(text: str) -> Decimal | None:
+    # parse_ocr_text splits lines the same way before calling _find_amount
+    return _find_amount([line.strip() for line in text.split("\n") if line.strip()])
+
+
+def main(count: int) -> None:
+    corpus = make_corpus(count)
+    parsers = (("legacy", legacy_find_amount), ("scored", _scored_find_amount))
+    print(f"{count:,} OCR texts")
+    print(f"{'':<10}{'µs/text':>9}{'correct':>9}")
+    for name, parse in parsers:
+        start = time.perf_counter()
+        found = [parse(text) for text, _ in corpus]
+        per_text = (time.perf_counter() - start) / count * 1e6
+        correct = sum(f == amount for f, (_, amount) in zip(found, corpus, strict=True)) / count
+        print(f"{name:<10}{per_text:>9.1f}{correct:>9.1%}")
+
+    print(f"\n{len(ADVERSARIAL)} adversarial texts")
+    for name, parse in parsers:
+        misses = [(text, amount, parse(text)) for text, amount in ADVERSARIAL]
+        misses = [miss for miss in misses if miss[1] != miss[2]]
+        print(f"{name:<10}{len(ADVERSARIAL) - len(misses)}/{len(ADVERSARIAL)} correct")
+        for text, amount, found in misses:
+            print(f"  {text!r}: expected {amount}, got {found}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,101 @@
+"""Benchmark: INCR+EXPIRE fixed window vs the GCRA Lua-script rate limiter.
+
+Runs concurrent checks for a pool of users against the configured Redis and
+prints throughput and latency of both implementations, then sanity-checks the
+GCRA burst: a user firing requests back to back gets exactly `burst` through.
+
+Usage:
+    python -m scripts.bench_rate_limiter [checks] [users] [concurrency]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import statistics
+import sys
+import time
+from collections.abc import Awaitable, Callable
+
+import redis.asyncio as redis
+
+from app.cache.rate_limiter import Limit, RateLimiter
+from app.cache.redis_client import close_redis, get_redis
+
+TG_ID_BASE = 9_300_000_000  # outside real Telegram ids, keys removed afterwards
+LIMIT = Limit(rate=30, burst=10)
+
+
+class _BenchLimiter(RateLimiter):
+    PREFIX = "rlbench:"
+
+
+async def _legacy_is_allowed(r: redis.Redis, user_id: int, limit: int, window: int) -> bool:
+    """The previous implementation: two round trips on a user's first hit."""
+    key = f"rlbench:legacy:{user_id}"
+    current = await r.incr(key)
+    if current == 1:
+        await r.expire(key, window)
+    return current <= limit
+
+
+async def _run(
+    check: Callable[[int], Awaitable[object]], checks: int, users: int, concurrency: int
+) -> tuple[float, float, float]:
+    """Return (checks/s, p50 ms, p99 ms)."""
+    latencies: list[float] = []
+    queue = iter(range(checks))
+
+    async def worker() -> None:
+        for i in queue:
+            start = time.perf_counter()
+            await check(TG_ID_BASE + i % users)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return checks / elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.99)]
+
+
+async def _cleanup(r: redis.Redis) -> None:
+    keys = [key async for key in r.scan_iter("rlbench:*", count=1000)]
+    for i in range(0, len(keys), 1000):
+        await r.delete(*keys[i : i + 1000])
+
+
+async def main(checks: int, users: int, concurrency: int) -> None:
+    r = await get_redis()
+    limiter = _BenchLimiter(r, {"message": LIMIT})
+
+    try:
+        await _cleanup(r)
+        legacy = await _run(
+            lambda uid: _legacy_is_allowed(r, uid, LIMIT.rate, LIMIT.period),
+            checks, users, concurrency,
+        )
+        await _cleanup(r)
+        gcra = await _run(lambda uid: limiter.hit(uid), checks, users, concurrency)
+
+        print(f"{checks:,} checks, {users} users, concurrency {concurrency}")
+        print(f"{'':<18}{'checks/s':>10}{'p50 ms':>9}{'p99 ms':>9}")
+        for name, (rate, p50, p99) in (("INCR+EXPIRE", legacy), ("GCRA (EVALSHA)", gcra)):
+            print(f"{name:<18}{rate:>10,.0f}{p50:>9.2f}{p99:>9.2f}")
+
+        await _cleanup(r)
+        results = [await limiter.hit(TG_ID_BASE) for _ in range(LIMIT.burst * 2)]
+        allowed = sum(res.allowed for res in results)
+        print(
+            f"\nburst check: {allowed}/{len(results)} allowed back to back "
+            f"(expected {LIMIT.burst}), retry after {results[-1].retry_after:.2f}s"
+        )
+    finally:
+        await _cleanup(r)
+        await close_redis()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:4]]
+    checks, users, concurrency = (args + [50_000, 1000, 50][len(args):])[:3]
+    asyncio.run(main(checks, users, concurrency))
@@ -0,0 +1,131 @@
+"""Benchmark: DB round trips per update, legacy two-session pipeline vs unit of work.
+
+Simulates polling load (many concurrent updates from a pool of users) against the
+configured PostgreSQL and counts pool checkouts, SQL statements and COMMITs.
+
+Usage:
+    python -m scripts.bench_request_pipeline [updates] [users] [concurrency]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+from aiogram.types import Chat, Message
+from aiogram.types import User as TgUser
+from sqlalchemy import delete, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import get_settings
+from app.middlewares.unit_of_work import UnitOfWorkMiddleware
+from app.models.user import User
+from app.repositories.category_repo import CategoryRepository
+from app.services.user_service import UserService
+
+TG_ID_BASE = 9_000_000_000  # far outside real Telegram ids, cleaned up afterwards
+
+
+@dataclass
+class Counters:
+    checkouts: int = 0
+    statements: int = 0
+    commits: int = 0
+
+    def reset(self) -> None:
+        self.checkouts = self.statements = self.commits = 0
+
+
+def _make_message(i: int, users: int) -> Message:
+    tg_id = TG_ID_BASE + i % users
+    return Message(
+        message_id=i,
+        date=datetime.now(),
+        chat=Chat(id=tg_id, type="private"),
+        from_user=TgUser(id=tg_id, is_bot=False, first_name="Bench"),
+        text="50000 обед",
+    )
+
+
+async def _handler(event: Message, data: dict) -> None:
+    """Representative handler: one read, like building the category keyboard."""
+    await CategoryRepository(data["session"]).get_for_user(data["user"].id)
+
+
+async def _legacy_update(factory: async_sessionmaker[AsyncSession], msg: Message) -> None:
+    """Old AuthMiddleware + DbSessionMiddleware: two sessions, two commits."""
+    async with factory() as session:
+        service = UserService(session)
+        user = await service.get_or_create(
+            telegram_id=msg.from_user.id,
+            first_name=msg.from_user.first_name,
+        )
+        await session.commit()
+    async with factory() as session:
+        await _handler(msg, {"session": session, "user": user})
+        await session.commit()
+
+
+async def _run(label: str, coro_factory, n: int, concurrency: int, counters: Counters) -> None:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with sem:
+            await coro_factory(i)
+
+    counters.reset()
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<14} {n / elapsed:>9.0f} upd/s"
+        f"  checkouts/upd={counters.checkouts / n:.2f}"
+        f"  statements/upd={counters.statements / n:.2f}"
+        f"  commits/upd={counters.commits / n:.2f}"
+    )
+
+
+async def main(n: int, users: int, concurrency: int) -> None:
+    settings = get_settings()
+    engine = create_async_engine(
+        settings.database_url, pool_size=20, max_overflow=10, pool_pre_ping=True
+    )
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    counters = Counters()
+
+    @event.listens_for(engine.sync_engine.pool, "checkout")
+    def _on_checkout(*_args) -> None:
+        counters.checkouts += 1
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _on_execute(*_args) -> None:
+        counters.statements += 1
+
+    @event.listens_for(engine.sync_engine, "commit")
+    def _on_commit(*_args) -> None:
+        counters.commits += 1
+
+    uow = UnitOfWorkMiddleware(session_factory=factory)
+    messages = [_make_message(i, users) for i in range(n)]
+
+    # Warm-up: create the bench users so both runs measure the steady state
+    await _run("warmup", lambda i: uow(_handler, messages[i], {}), users, concurrency, counters)
+    await _run("legacy", lambda i: _legacy_update(factory, messages[i]), n, concurrency, counters)
+    await _run("unit-of-work", lambda i: uow(_handler, messages[i], {}), n, concurrency, counters)
+    print("(each checkout also costs one pre-ping round trip)")
+
+    async with factory() as session:
+        await session.execute(
+            delete(User).where(User.telegram_id.between(TG_ID_BASE, TG_ID_BASE + users))
+        )
+        await session.commit()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:4]]
+    n, users, concurrency = (args + [5000, 200, 50][len(args):])[:3]
+    asyncio.run(main(n, users, concurrency))
@@ -0,0 +1,43 @@
+"""Consistency check: compare monthly_rollups with raw transactions.
+
+Usage:
+    python -m scripts.check_rollups [--fix] [user_id]
+
+Prints every drifting (user, month, type, category) key and exits with status 1
+if any were found. With --fix, affected users are rebuilt afterwards.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+
+from app.db.session import get_session
+from app.repositories.rollup_repo import RollupRepository
+
+
+async def check(user_id: int | None = None, fix: bool = False) -> int:
+    async with get_session() as session:
+        repo = RollupRepository(session)
+        drift = await repo.find_drift(user_id)
+        for row in drift:
+            print(
+                f"user={row.user_id} {row.year}-{row.month:02d} {row.type}"
+                f" cat={row.category_id}: expected {row.expected_total} ({row.expected_count})"
+                f" got {row.actual_total} ({row.actual_count})"
+            )
+
+        if drift and fix:
+            user_ids = sorted({row.user_id for row in drift})
+            for uid in user_ids:
+                await repo.rebuild(uid)
+            await session.commit()
+            print(f"🔧 Rebuilt rollups for {len(user_ids)} users")
+
+    print(f"{'❌' if drift else '✅'} {len(drift)} drifting rollup rows")
+    return 1 if drift else 0
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if a != "--fix"]
+    sys.exit(asyncio.run(check(int(args[0]) if args else None, "--fix" in sys.argv)))
@@ -15,8 +15,11 @@ from sqlalchemy import select
 
 from app.db.session import get_session
 from app.models.category import Category
-from app.models.transaction import Transaction
 from app.models.user import User
+from app.repositories.rollup_repo import RollupRepository
+from app.repositories.transaction_repo import TransactionRepository
+
+BATCH_SIZE = 5000  # rows per add_many call
 
 
 async def migrate(sqlite_path: str, telegram_id: int) -> None:
@@ -32,7 +35,6 @@ async def migrate(sqlite_path: str, telegram_id: int) -> None:
             user = User(telegram_id=telegram_id, first_name="Migrated User")
             session.add(user)
             await session.commit()
-            await session.refresh(user)
         user_id = user.id
 
     # 2. Read old custom categories
@@ -75,25 +77,28 @@ async def migrate(sqlite_path: str, telegram_id: int) -> None:
         )
         old_expenses = await cursor.fetchall()
 
-    # 6. Insert transactions
+    # 6. Insert transactions (multi-row INSERTs, one transaction)
+    rows = [
+        {
+            "user_id": user_id,
+            "type": row["type"] or "expense",
+            "amount": Decimal(str(row["amount"])),
+            "currency": "UZS",
+            "amount_base": Decimal(str(row["amount"])),
+            "category_id": cat_map.get(row["category"]),
+            "description": row["description"] or "",
+            "source": row["source"] or "text",
+        }
+        for row in old_expenses
+    ]
     async with get_session() as session:
-        count = 0
-        for row in old_expenses:
-            category_id = cat_map.get(row["category"])
-            session.add(
-                Transaction(
-                    user_id=user_id,
-                    type=row["type"] or "expense",
-                    amount=Decimal(str(row["amount"])),
-                    currency="UZS",
-                    amount_base=Decimal(str(row["amount"])),
-                    category_id=category_id,
-                    description=row["description"] or "",
-                    source=row["source"] or "text",
-                )
-            )
-            count += 1
+        repo = TransactionRepository(session)
+        for i in range(0, len(rows), BATCH_SIZE):
+            await repo.add_many(rows[i : i + BATCH_SIZE])
+            session.expunge_all()  # don't keep every inserted row in the identity map
+        await RollupRepository(session).rebuild(user_id)
         await session.commit()
+    count = len(rows)
 
     print(f"✅ Migrated {count} transactions and {len(old_categories)} custom categories")
     print(f"   User: telegram_id={telegram_id}, db_id={user_id}")
@@ -6,6 +6,8 @@ import asyncio
 
 from sqlalchemy import select
 
+from app.cache.category_catalogue import CategoryCatalogue
+from app.cache.redis_client import get_redis
 from app.db.session import get_session
 from app.models.category import Category
 
@@ -33,6 +35,7 @@ DEFAULT_CATEGORIES = [
 
 
 async def seed() -> None:
+    added = 0
     async with get_session() as session:
         for key, label, icon in DEFAULT_CATEGORIES:
             exists = await session.execute(
@@ -52,8 +55,13 @@ async def seed() -> None:
                         user_id=None,
                     )
                 )
+                added += 1
         await session.commit()
-    print(f"✅ Seeded {len(DEFAULT_CATEGORIES)} default categories")
+
+    # Tell running workers to reload their in-process category catalogue
+    if added:
+        await CategoryCatalogue(await get_redis()).publish_refresh()
+    print(f"✅ Seeded {len(DEFAULT_CATEGORIES)} default categories ({added} new)")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,95 @@
+"""SQL statements per update for the hot flows stay within budget.
+
+The DB work of /start, a text expense and /report runs through
+UnitOfWorkMiddleware with the user cache disabled (the worst case) for a user
+with a long transaction history; the counts must not grow with the history.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+import pytest
+from aiogram.types import Chat, Message
+from aiogram.types import User as TgUser
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.middlewares.unit_of_work import UnitOfWorkMiddleware
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services.category_service import CategoryService
+from app.services.report_service import ReportService
+
+TG_ID = 9_100_000_000
+HISTORY_SIZE = 500
+
+
+async def _start(event: Message, data: dict[str, Any]) -> None:
+    """cmd_start only reads the injected user."""
+
+
+async def _text_expense(event: Message, data: dict[str, Any]) -> None:
+    await CategoryService(data["session"]).get_for_user(data["user"].id)
+
+
+async def _report(event: Message, data: dict[str, Any]) -> None:
+    now = datetime.now()
+    await ReportService(data["session"]).build_monthly_text_report(
+        user_id=data["user"].id, year=now.year, month=now.month
+    )
+
+
+@pytest.fixture
+async def user_with_history(session_factory: async_sessionmaker[AsyncSession]) -> None:
+    async with session_factory() as session:
+        user = User(telegram_id=TG_ID, first_name="QueryCount", is_registered=True)
+        session.add(user)
+        await session.flush()
+        await session.execute(
+            insert(Transaction),
+            [
+                {
+                    "user_id": user.id,
+                    "type": "expense",
+                    "amount": Decimal(1000 + i),
+                    "amount_base": Decimal(1000 + i),
+                    "description": f"seed {i}",
+                }
+                for i in range(HISTORY_SIZE)
+            ],
+        )
+        await session.commit()
+
+
+@pytest.mark.usefixtures("user_with_history")
+@pytest.mark.parametrize(
+    ("handler", "budget"),
+    [
+        pytest.param(_start, 1, id="/start"),  # user lookup
+        pytest.param(_text_expense, 2, id="text expense"),
+        pytest.param(_report, 4, id="/report"),
+    ],
+)
+async def test_flow_statement_budget(
+    session_factory: async_sessionmaker[AsyncSession],
+    statements: list[str],
+    handler: Callable[[Message, dict[str, Any]], Awaitable[None]],
+    budget: int,
+) -> None:
+    message = Message(
+        message_id=1,
+        date=datetime.now(),
+        chat=Chat(id=TG_ID, type="private"),
+        from_user=TgUser(id=TG_ID, is_bot=False, first_name="QueryCount"),
+        text="/start",
+    )
+    uow = UnitOfWorkMiddleware(session_factory=session_factory)
+
+    statements.clear()
+    await uow(handler, message, {})
+
+    assert len(statements) <= budget, "\n".join(statements)
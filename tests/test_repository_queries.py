@@ -0,0 +1,74 @@
+"""Create-style repository methods cost exactly their INSERT.
+
+Server defaults (id, created_at, language, ...) must come back through
+RETURNING, not a refresh SELECT, and reading them afterwards must not trigger
+a lazy load.
+"""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.user import User
+from app.repositories.category_repo import CategoryRepository
+from app.repositories.currency_repo import ExchangeRateRepository
+from app.repositories.transaction_repo import TransactionRepository
+from app.repositories.user_repo import UserRepository
+
+TG_ID = 9_400_000_000
+
+
+@pytest.fixture
+async def session(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> AsyncIterator[AsyncSession]:
+    async with session_factory() as session:
+        yield session
+
+
+@pytest.fixture
+async def user(session: AsyncSession) -> User:
+    return await UserRepository(session).upsert(TG_ID, first_name="QueryCheck")
+
+
+async def test_user_upsert_new(session: AsyncSession, statements: list[str]) -> None:
+    statements.clear()
+    user = await UserRepository(session).upsert(TG_ID, first_name="QueryCheck")
+
+    assert len(statements) <= 2, "\n".join(statements)  # lookup + INSERT
+    assert user.created_at is not None
+    assert user.language is not None
+
+
+async def test_transaction_add(session: AsyncSession, user: User, statements: list[str]) -> None:
+    statements.clear()
+    transaction = await TransactionRepository(session).add(user.id, "expense", Decimal(1000))
+
+    assert len(statements) <= 1, "\n".join(statements)
+    assert transaction.created_at is not None
+
+
+async def test_category_create_custom(
+    session: AsyncSession, user: User, statements: list[str]
+) -> None:
+    statements.clear()
+    category = await CategoryRepository(session).create_custom(
+        user.id, "query_check", "QueryCheck"
+    )
+
+    assert len(statements) <= 1, "\n".join(statements)
+    assert category.created_at is not None
+
+
+async def test_exchange_rate_upsert(session: AsyncSession, statements: list[str]) -> None:
+    statements.clear()
+    rate = await ExchangeRateRepository(session).upsert_rate(
+        "USD", "UZS", Decimal(12_000), source="query-check"
+    )
+
+    assert len(statements) <= 1, "\n".join(statements)
+    assert rate.fetched_at is not None